@@ -12,20 +12,29 @@ Then open http://127.0.0.1:8090/ in your browser.
 """
 
 import builtins as _builtins
-import re as _re
 import sys
 import os
 import signal
 
 # Remove emojis from output for Windows terminal compatibility
 _builtin_print = _builtins.print
-emoji_pattern = _re.compile(r'[\U0001F300-\U0001FAD6\U0001FAE0-\U0001FAFF\U00002700-\U000027BF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\U0001F700-\U0001F77F\U0001F780-\U0001F7FF\U000025A0-\U000026FF]+', flags=_re.UNICODE)
+
+class _Cp1252Filter(dict):
+    """str.translate table deleting characters cp1252 can't encode; filled lazily per code point"""
+    def __missing__(self, c):
+        v = c if chr(c).encode('cp1252', errors='ignore') else None
+        self[c] = v
+        return v
+
+_cp1252_filter = _Cp1252Filter()
 
 def _no_emoji_print(*args, **kwargs):
     cleaned_args = []
     for a in args:
-        s = str(a)
-        s = s.encode('cp1252', errors='ignore').decode('cp1252')
+        s = a if type(a) is str else str(a)
+        # Pure-ASCII strings (nearly every print) are already cp1252-safe
+        if not s.isascii():
+            s = s.translate(_cp1252_filter)
         cleaned_args.append(s)
     return _builtin_print(*cleaned_args, **kwargs)
 
@@ -43,8 +52,8 @@ import asyncio
 import json
 import threading
 import time
-import base64
-from collections import deque
+import functools
+import re
 
 import numpy as np
 from flask import Flask, render_template
@@ -57,6 +66,34 @@ import go2_webrtc_driver.unitree_auth as _unitree_auth
 import go2_webrtc_driver.webrtc_driver as _webrtc_driver_mod
 from aiortc import RTCPeerConnection, RTCSessionDescription
 
+from ring_buffer import SPSCRingBuffer
+
+# Optional libuv-based event loop for the WebRTC thread (not available on Windows)
+try:
+    import uvloop
+    HAVE_UVLOOP = True
+except ImportError:
+    HAVE_UVLOOP = False
+
+# Optional faster JSON codec for Socket.IO packets
+try:
+    import orjson
+
+    class _OrjsonCodec:
+        """json-module stand-in for python-socketio backed by orjson."""
+
+        @staticmethod
+        def dumps(obj, *args, **kwargs):
+            return orjson.dumps(obj).decode()
+
+        @staticmethod
+        def loads(s, *args, **kwargs):
+            return orjson.loads(s)
+
+    _socketio_json = _OrjsonCodec
+except ImportError:
+    _socketio_json = json
+
 # Flask app setup
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'animus-go2-audio-stream-secret'
@@ -67,19 +104,25 @@ socketio = SocketIO(
     ping_timeout=120,
     ping_interval=25,
     max_http_buffer_size=1000000,
+    json=_socketio_json,
     engineio_logger=False,
     logger=False
 )
 
-# Audio chunk storage
-audio_queue = deque(maxlen=200)
-audio_queue_lock = threading.Lock()
+# Audio chunk storage: audio_track_handler pushes, audio_stream_thread pops
+audio_queue = SPSCRingBuffer(256)
+
+# Chunks (~20 ms each) coalesced into one 'audio_chunk_batch' emit
+AUDIO_BATCH_MAX = 5
+# Seconds of audio the client may have queued ahead of real time before the
+# stream thread backs off; below this it sends as fast as chunks arrive
+AUDIO_PLAY_AHEAD = 0.1
 
 # Stats tracking
 stats = {
     'chunks_received': 0,
     'chunks_sent': 0,
-    'last_chunk_time': None,
+    'last_chunk_time': None,  # time.monotonic()
     'start_time': None,
     'connection_state': 'disconnected',
     'sample_rate': None,
@@ -99,18 +142,21 @@ _orig_wait_datachannel_open = _webrtc_datachannel.WebRTCDataChannel.wait_datacha
 
 async def _patched_wait_datachannel_open(self, timeout=5):
     """Extended wait for data channel with better logging."""
-    deadline = time.time() + 30.0
-    last_log = 0
-    while time.time() < deadline:
+    deadline = time.monotonic() + 30.0
+    last_log = float("-inf")
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            break
         if getattr(self, "data_channel_opened", False):
             return
         channel = getattr(self, "channel", None)
         state = getattr(channel, "readyState", None)
         if state == "open":
             return
-        if time.time() - last_log >= 2.0:
+        if now - last_log >= 2.0:
             _builtin_print(f"Waiting for datachannel readyState={state}")
-            last_log = time.time()
+            last_log = now
         await asyncio.sleep(0.1)
     _builtin_print("Warning: data channel did not report open within 30s; continuing anyway")
     channel = getattr(self, "channel", None)
@@ -123,42 +169,46 @@ _webrtc_datachannel.WebRTCDataChannel.wait_datachannel_open = _patched_wait_data
 # SDP patches for aiortc/Go2 compatibility
 _orig_send_local = _unitree_auth.send_sdp_to_local_peer
 
+_LEGACY_SCTPMAP = "a=sctpmap:5000 webrtc-datachannel 65535"
+# One pass over the three line kinds the rewrite cares about
+_SDP_LEGACY_RE = re.compile(
+    r"^(?:m=application(?:[ \t]+(\S+))?[^\r\n]*|(a=sctp-port)[^\r\n]*|(a=sctpmap)[^\r\n]*)",
+    re.MULTILINE,
+)
+_STRONG_FINGERPRINT_RE = re.compile(r"^a=fingerprint:sha-(?:384|512)[^\r\n]*(?:\r?\n)?", re.MULTILINE)
+
+@functools.lru_cache(maxsize=8)
+def _rewrite_sdp_str(sdp):
+    # Identical offers recur on every retry, hence the cache
+    seen = {"m_application": False, "sctpmap": False}
+
+    def repl(m):
+        if m.group(3):
+            seen["sctpmap"] = True
+            return m.group(0)
+        if m.group(2):
+            seen["sctpmap"] = True
+            return _LEGACY_SCTPMAP
+        seen["m_application"] = True
+        return f"m=application {m.group(1) or '9'} UDP/DTLS/SCTP 5000"
+
+    sdp = _SDP_LEGACY_RE.sub(repl, sdp).rstrip("\r\n") + "\r\n"
+    if seen["m_application"] and not seen["sctpmap"]:
+        sdp += _LEGACY_SCTPMAP + "\r\n"
+    return sdp
+
 def _rewrite_sdp_to_legacy(sdp: str) -> str:
     """Rewrite SDP from RFC 8841 format to legacy format for aiortc compatibility."""
     if not isinstance(sdp, str):
         return sdp
-    lines = []
-    saw_m_application = False
-    saw_sctpmap = False
-    for line in sdp.splitlines():
-        if line.startswith("m=application"):
-            parts = line.split()
-            port = parts[1] if len(parts) > 1 else "9"
-            lines.append(f"m=application {port} UDP/DTLS/SCTP 5000")
-            saw_m_application = True
-        elif line.startswith("a=sctp-port"):
-            lines.append("a=sctpmap:5000 webrtc-datachannel 65535")
-            saw_sctpmap = True
-        elif line.startswith("a=sctpmap"):
-            lines.append(line)
-            saw_sctpmap = True
-        else:
-            lines.append(line)
-    if saw_m_application and not saw_sctpmap:
-        lines.append("a=sctpmap:5000 webrtc-datachannel 65535")
-    return "\r\n".join(lines) + "\r\n"
+    return _rewrite_sdp_str(sdp)
 
 def _patched_send_sdp(ip, sdp):
     """Patch SDP exchange to strip problematic fingerprints and rewrite to legacy format."""
     try:
         payload = json.loads(sdp)
-        offer_sdp = payload.get("sdp", "")
-        filtered = [
-            line for line in offer_sdp.splitlines()
-            if not line.startswith("a=fingerprint:sha-384")
-            and not line.startswith("a=fingerprint:sha-512")
-        ]
-        payload["sdp"] = _rewrite_sdp_to_legacy("\r\n".join(filtered) + "\r\n")
+        offer_sdp = _STRONG_FINGERPRINT_RE.sub("", payload.get("sdp", ""))
+        payload["sdp"] = _rewrite_sdp_to_legacy(offer_sdp)
         sdp = json.dumps(payload)
     except Exception:
         pass
@@ -203,6 +253,30 @@ _webrtc_driver_mod.Go2WebRTCConnection.get_answer_from_local_peer = _patched_get
 
 # === Audio handling ===
 
+# Reused int16 output buffer for audio_track_handler; grown if a frame is larger
+_pcm16_scratch = np.empty(8192, dtype=np.int16)
+
+def to_pcm16(samples, channels):
+    """Return interleaved 16-bit PCM bytes for a (channels, frames) or flat sample array.
+
+    The interleave and the int16 cast happen in one np.copyto pass into the
+    reused scratch buffer, so the only per-frame allocation is the bytes result.
+    """
+    global _pcm16_scratch
+    # Packed s16 frames (aiortc's usual output) already are interleaved int16
+    if (samples.dtype == np.int16 and samples.flags['C_CONTIGUOUS']
+            and (samples.ndim == 1 or channels == 1)):
+        return samples.tobytes()
+    n = samples.size
+    if n > _pcm16_scratch.size:
+        _pcm16_scratch = np.empty(n, dtype=np.int16)
+    out = _pcm16_scratch[:n]
+    if samples.ndim == 2:
+        np.copyto(out.reshape(-1, channels), samples.T, casting='unsafe')
+    else:
+        np.copyto(out, samples, casting='unsafe')
+    return out.tobytes()
+
 async def audio_track_handler(track):
     """Read audio frames from the track and enqueue them for streaming."""
     global stats
@@ -221,22 +295,19 @@ async def audio_track_handler(track):
                 samples = frame.to_ndarray()
 
                 if samples.ndim == 1:
-                    interleaved = samples
                     channels = 1
                 elif samples.ndim == 2:
                     channels = samples.shape[0]
-                    interleaved = samples.T.reshape(-1)
                 else:
                     continue
 
-                pcm16 = interleaved.astype(np.int16, copy=False).tobytes()
+                pcm16 = to_pcm16(samples, channels)
                 sample_rate = frame.sample_rate
 
-                with audio_queue_lock:
-                    audio_queue.append((pcm16, sample_rate, channels))
+                audio_queue.push((pcm16, sample_rate, channels))
 
                 stats['chunks_received'] += 1
-                stats['last_chunk_time'] = time.time()
+                stats['last_chunk_time'] = time.monotonic()
                 stats['sample_rate'] = sample_rate
                 stats['channels'] = channels
 
@@ -248,12 +319,22 @@ async def audio_track_handler(track):
 
 # === WebRTC connection management ===
 
+async def _wait_any(*events, timeout=None):
+    """Wait until any of the asyncio.Events is set; return False on timeout."""
+    waiters = [asyncio.create_task(event.wait()) for event in events]
+    try:
+        done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+    return bool(done)
+
 async def run_webrtc_connection():
     """Run the WebRTC connection in a separate thread."""
     global _shutdown_requested
 
-    # Flag to track if we detected the background task error
-    connection_error_detected = {"value": False}
+    # Set when we detect the background task error; wakes the connect/state waits
+    connection_error_event = asyncio.Event()
 
     # Set up exception handler to catch background task errors
     def exception_handler(loop, context):
@@ -265,7 +346,7 @@ async def run_webrtc_connection():
                 # This is the known intermittent error - log as warning and set flag
                 _builtin_print(f"WARNING: Intermittent connection error detected (background task): {msg}")
                 _builtin_print("         This usually indicates a stale connection. Retrying...")
-                connection_error_detected["value"] = True
+                connection_error_event.set()
                 return  # Don't propagate, we'll handle via retry logic
         # For other exceptions, use default handler
         loop.default_exception_handler(context)
@@ -288,54 +369,66 @@ async def run_webrtc_connection():
                 conn = Go2WebRTCConnection(WebRTCConnectionMethod.LocalAP)
                 
                 # Reset flag before connecting
-                connection_error_detected["value"] = False
+                connection_error_event.clear()
                 
                 # Wrap connect() with error monitoring
                 async def connect_with_monitoring():
                     connect_task = asyncio.create_task(conn.connect())
-                    # Monitor for errors while connecting
-                    while not connect_task.done():
-                        if connection_error_detected["value"]:
+                    error_task = asyncio.create_task(connection_error_event.wait())
+                    try:
+                        # Wake on whichever finishes first instead of polling the flag
+                        await asyncio.wait({connect_task, error_task}, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        error_task.cancel()
+                        # Also reached when wait_for() times out and cancels us
+                        if not connect_task.done():
                             connect_task.cancel()
-                            raise RuntimeError("Background task error detected during connect - stale connection")
-                        await asyncio.sleep(0.05)  # Check every 50ms
-                    return await connect_task
+                    if connection_error_event.is_set():
+                        raise RuntimeError("Background task error detected during connect - stale connection")
+                    return connect_task.result()
                 
                 await asyncio.wait_for(connect_with_monitoring(), timeout=60.0)
                 
                 # IMMEDIATELY check if error was detected during connect
-                if connection_error_detected["value"]:
+                if connection_error_event.is_set():
                     raise RuntimeError("Background task error detected during connect - stale connection")
 
                 # Quick validation - check connection state with aggressive timeout
-                pc = getattr(conn, "pc", None)
+                pc = conn.pc
                 if not pc:
                     raise RuntimeError("Peer connection not created")
                 
-                # Poll for connected state, but bail immediately if error flag is set
-                start_time = asyncio.get_event_loop().time()
-                while True:
-                    # Check error flag FIRST - highest priority
-                    if connection_error_detected["value"]:
-                        raise RuntimeError("Background task error detected - stale connection")
-                    
-                    # Check connection state
-                    state = getattr(pc, "connectionState", None)
-                    if state == "connected":
-                        # Verify we have remote description
-                        if pc.remoteDescription:
-                            break  # Success!
-                        else:
-                            raise RuntimeError("Connected but no remote description")
-                    
-                    if state in {"failed", "disconnected", "closed"}:
-                        raise RuntimeError(f"Connection state is {state} - cannot proceed")
-                    
-                    # Timeout after 2 seconds
-                    if asyncio.get_event_loop().time() - start_time > 2.0:
-                        raise RuntimeError("Connection state not progressing to 'connected' - possible stale connection")
-                    
-                    await asyncio.sleep(0.05)  # Check every 50ms
+                # Wait for connected state, waking on each state change and bailing
+                # immediately if the error event fires
+                state_changed = asyncio.Event()
+                pc.on("connectionstatechange", state_changed.set)
+                deadline = loop.time() + 2.0
+                try:
+                    while True:
+                        # Check error flag FIRST - highest priority
+                        if connection_error_event.is_set():
+                            raise RuntimeError("Background task error detected - stale connection")
+                        
+                        # Check connection state
+                        state_changed.clear()
+                        state = pc.connectionState
+                        if state == "connected":
+                            # Verify we have remote description
+                            if pc.remoteDescription:
+                                break  # Success!
+                            else:
+                                raise RuntimeError("Connected but no remote description")
+                        
+                        if state in {"failed", "disconnected", "closed"}:
+                            raise RuntimeError(f"Connection state is {state} - cannot proceed")
+                        
+                        # Timeout after 2 seconds
+                        remaining = deadline - loop.time()
+                        if remaining <= 0 or not await _wait_any(state_changed, connection_error_event,
+                                                                 timeout=remaining):
+                            raise RuntimeError("Connection state not progressing to 'connected' - possible stale connection")
+                finally:
+                    pc.remove_listener("connectionstatechange", state_changed.set)
 
                 _builtin_print("✓ Connection established!")
 
@@ -375,7 +468,7 @@ async def run_webrtc_connection():
                             await asyncio.wait_for(conn.disconnect(), timeout=5.0)
                         except Exception:
                             pass
-                    connection_error_detected["value"] = False
+                    connection_error_event.clear()
 
             if attempt < max_attempts and not _shutdown_requested:
                 _builtin_print("Retrying connection in 1 second...")
@@ -389,28 +482,28 @@ async def run_webrtc_connection():
 
         # Connection successful - run main loop
         try:
+            pc = conn.pc
+            datachannel = conn.datachannel
 
-            last_keepalive = time.time()
+            last_keepalive = time.monotonic()
             while not _shutdown_requested:
-                current_time = time.time()
+                current_time = time.monotonic()
 
                 # Check for background task errors during operation
-                if connection_error_detected["value"]:
+                if connection_error_event.is_set():
                     _builtin_print("Background task error detected during operation - reconnecting...")
                     break
 
                 if current_time - last_keepalive > 20.0:
                     try:
-                        await conn.datachannel.disableTrafficSaving(True)
+                        await datachannel.disableTrafficSaving(True)
                         last_keepalive = current_time
                     except Exception as e:
                         _builtin_print(f"Keepalive failed: {e}")
 
-                if hasattr(conn, 'pc') and conn.pc:
-                    pc_state = getattr(conn.pc, 'connectionState', 'unknown')
-                    if pc_state != 'connected':
-                        _builtin_print(f"Peer connection state: {pc_state}")
-                        break
+                if pc.connectionState != 'connected':
+                    _builtin_print(f"Peer connection state: {pc.connectionState}")
+                    break
 
                 if stats['last_chunk_time'] and (current_time - stats['last_chunk_time'] > 10.0):
                     _builtin_print("No audio chunks received for 10+ seconds - connection may be dead")
@@ -438,7 +531,10 @@ async def run_webrtc_connection():
 def start_webrtc_thread():
     """Start WebRTC connection in a background thread."""
     def run_async():
-        asyncio.run(run_webrtc_connection())
+        if HAVE_UVLOOP:
+            uvloop.run(run_webrtc_connection())
+        else:
+            asyncio.run(run_webrtc_connection())
 
     thread = threading.Thread(target=run_async, daemon=True)
     thread.start()
@@ -468,37 +564,49 @@ def handle_get_stats():
         'connection_state': stats['connection_state'],
         'chunks_received': stats['chunks_received'],
         'chunks_sent': stats['chunks_sent'],
+        'chunks_dropped': audio_queue.dropped,
         'uptime': uptime,
         'sample_rate': stats['sample_rate'],
         'channels': stats['channels']
     })
 
 def audio_stream_thread():
-    """Thread to send audio chunks to connected clients."""
+    """Thread to send audio chunks to connected clients, up to AUDIO_BATCH_MAX per emit."""
+    # Audio sent but not yet played out, assuming the client plays in real time
+    buffered = 0.0
+    last = time.monotonic()
     while not _shutdown_requested:
         try:
-            chunk = None
-            with audio_queue_lock:
-                if audio_queue:
-                    chunk = audio_queue.popleft()
-
-            if chunk:
+            now = time.monotonic()
+            buffered = max(0.0, buffered - (now - last))
+            last = now
+
+            batch = []
+            duration = 0.0
+            while len(batch) < AUDIO_BATCH_MAX:
+                chunk = audio_queue.try_pop()
+                if chunk is None:
+                    break
                 pcm_bytes, sample_rate, channels = chunk
                 if sample_rate and channels:
-                    duration = len(pcm_bytes) / (sample_rate * channels * 2)
+                    duration += len(pcm_bytes) / (sample_rate * channels * 2)
                 else:
-                    duration = 0.02
+                    duration += 0.02
 
-                b64_audio = base64.b64encode(pcm_bytes).decode('ascii')
-                socketio.emit('audio_chunk', {
-                    'data': b64_audio,
+                batch.append({
+                    # Raw bytes go out as a binary Socket.IO attachment
+                    'data': pcm_bytes,
                     'sample_rate': sample_rate,
                     'channels': channels
                 })
 
-                stats['chunks_sent'] += 1
+            if batch:
+                socketio.emit('audio_chunk_batch', {'chunks': batch})
+                stats['chunks_sent'] += len(batch)
+                buffered += duration
 
-                time.sleep(max(duration, 0.01))
+                if buffered > AUDIO_PLAY_AHEAD:
+                    time.sleep(buffered - AUDIO_PLAY_AHEAD)
             else:
                 time.sleep(0.01)
         except Exception as e:
@@ -0,0 +1,58 @@
+"""Lock-free ring buffer handing audio chunks from the WebRTC track to the stream thread."""
+
+
+class SPSCRingBuffer:
+    """Bounded single-producer/single-consumer queue without a lock.
+
+    Only the producer advances tail and only the consumer advances head; each
+    slot is stored before the index that publishes it, and the GIL makes those
+    reference/int stores atomic. When full, push() overwrites the oldest slot
+    and the consumer skips past whatever was overwritten, counting it in
+    dropped, so live audio stays live instead of queueing stale chunks.
+
+    push() stores into slot tail before publishing tail + 1, so once the ring
+    is full the slot at head may already hold the next item: only the newest
+    capacity - 1 items are treated as readable.
+    """
+
+    def __init__(self, capacity=256):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self._buf = [None] * capacity
+        self._mask = capacity - 1
+        self._capacity = capacity
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return min(self._tail - self._head, self._capacity - 1)
+
+    def push(self, item):
+        """Append item, overwriting the oldest one if the buffer is full."""
+        tail = self._tail
+        self._buf[tail & self._mask] = item
+        self._tail = tail + 1
+
+    def try_pop(self):
+        """Remove and return the oldest item, or None if the buffer is empty."""
+        while True:
+            head = self._head
+            tail = self._tail
+            if head == tail:
+                return None
+            if tail - head >= self._capacity:
+                # Full or lapped: the oldest items are gone, and the slot at head
+                # is the one the producer writes next
+                oldest = tail - self._capacity + 1
+                self.dropped += oldest - head
+                head = oldest
+            item = self._buf[head & self._mask]
+            # Slots aren't cleared after reading since the producer may already be
+            # reusing them; re-check instead that this one wasn't overwritten
+            # while we read it
+            if self._tail - head >= self._capacity:
+                self._head = head
+                continue
+            self._head = head + 1
+            return item
@@ -41,8 +41,10 @@ class AudioPlayer {
             this.isReady = false;
         });
 
-        this.socket.on('audio_chunk', (chunk) => {
-            this.handleAudioChunk(chunk);
+        this.socket.on('audio_chunk_batch', (batch) => {
+            for (const chunk of batch.chunks || []) {
+                this.handleAudioChunk(chunk);
+            }
         });
 
         this.socket.on('stats', (stats) => {
@@ -85,8 +87,8 @@ class AudioPlayer {
             this.sampleRate = sample_rate || this.sampleRate || 48000;
             this.channels = channels || this.channels || 1;
 
-            const buffer = this.base64ToArrayBuffer(data);
-            const audioBuffer = this.buildAudioBuffer(buffer, this.sampleRate, this.channels);
+            // data is the raw interleaved int16 PCM as an ArrayBuffer
+            const audioBuffer = this.buildAudioBuffer(data, this.sampleRate, this.channels);
 
             const source = this.audioContext.createBufferSource();
             source.buffer = audioBuffer;
@@ -101,16 +103,6 @@ class AudioPlayer {
         }
     }
 
-    base64ToArrayBuffer(base64) {
-        const binaryString = atob(base64);
-        const len = binaryString.length;
-        const bytes = new Uint8Array(len);
-        for (let i = 0; i < len; i++) {
-            bytes[i] = binaryString.charCodeAt(i);
-        }
-        return bytes.buffer;
-    }
-
     buildAudioBuffer(arrayBuffer, sampleRate, channels) {
         const int16Data = new Int16Array(arrayBuffer);
         const frameCount = Math.floor(int16Data.length / channels);
@@ -150,6 +142,11 @@ class AudioPlayer {
             chunksSent.textContent = (stats.chunks_sent || 0).toLocaleString();
         }
 
+        const chunksDropped = document.getElementById('chunks-dropped');
+        if (chunksDropped) {
+            chunksDropped.textContent = (stats.chunks_dropped || 0).toLocaleString();
+        }
+
         const sampleRateElement = document.getElementById('sample-rate');
         if (sampleRateElement) {
             sampleRateElement.textContent = stats.sample_rate ? `${stats.sample_rate} Hz` : '—';
@@ -0,0 +1,79 @@
+"""Stress test for SPSCRingBuffer's overwrite-oldest protocol."""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ring_buffer import SPSCRingBuffer  # noqa: E402
+
+
+class _YieldingRingBuffer(SPSCRingBuffer):
+    """Yields between storing a slot and publishing it whenever the ring is full.
+
+    That is exactly when the stored slot is the one the consumer reads next.
+    """
+
+    def push(self, item):
+        tail = self._tail
+        self._buf[tail & self._mask] = item
+        if tail - self._head >= self._capacity:
+            time.sleep(0)
+        self._tail = tail + 1
+
+
+def _run(ring, count):
+    delivered = []
+    done = threading.Event()
+
+    def producer():
+        for i in range(count):
+            ring.push(i)
+        done.set()
+
+    def consumer():
+        while True:
+            # Read the flag before popping: an empty pop after the producer
+            # finished means every pushed item has been seen
+            finished = done.is_set()
+            item = ring.try_pop()
+            if item is None:
+                if finished:
+                    return
+                time.sleep(0)
+                continue
+            delivered.append(item)
+            # A slow consumer keeps the ring full, where the producer overwrites
+            # the slot being read
+            if len(delivered) % 3 == 0:
+                time.sleep(0)
+
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=producer), threading.Thread(target=consumer)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(old_interval)
+    return delivered
+
+
+def test_items_strictly_increasing_without_duplicates():
+    count = 20000
+    for ring in (SPSCRingBuffer(16), _YieldingRingBuffer(16)):
+        delivered = _run(ring, count)
+        assert delivered, "consumer received nothing"
+        assert all(a < b for a, b in zip(delivered, delivered[1:])), "duplicate or out-of-order item"
+        assert len(delivered) + ring.dropped == count
+
+
+def test_full_idle_ring_pops_without_spinning():
+    ring = SPSCRingBuffer(4)
+    for i in range(10):
+        ring.push(i)
+    assert [ring.try_pop() for _ in range(4)] == [7, 8, 9, None]
+    assert ring.dropped == 7
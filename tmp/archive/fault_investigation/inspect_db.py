@@ -2,15 +2,27 @@
 import sqlite3
 import json
 import os
+import struct
 from datetime import datetime
 
+# orjson is optional; both loaders accept bytes
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 db_path = os.path.join(os.path.dirname(__file__), 'sensor_data.db')
 
 if not os.path.exists(db_path):
     print("Database file does not exist!")
     exit(1)
 
-conn = sqlite3.connect(db_path)
+conn = sqlite3.connect(db_path, isolation_level=None)
+# Read-only inspection: larger page cache and memory-mapped reads
+conn.execute("PRAGMA query_only=1")
+conn.execute("PRAGMA cache_size=-20000")
+conn.execute("PRAGMA mmap_size=268435456")
 cursor = conn.cursor()
 
 # Check tables
@@ -19,38 +31,37 @@ tables = cursor.fetchall()
 print("Tables:", [t[0] for t in tables])
 print()
 
-# Check row counts
-cursor.execute("SELECT COUNT(*) FROM lowstate")
-lowstate_count = cursor.fetchone()[0]
-print(f"Lowstate rows: {lowstate_count}")
-
-cursor.execute("SELECT COUNT(*) FROM sportmodestate")
-sportmodestate_count = cursor.fetchone()[0]
+# Check row counts (one statement for all four tables); lowstate is stored
+# in blocks of samples, so its count is the sum of the block counts
+cursor.execute("""
+    SELECT (SELECT IFNULL(SUM(count), 0) FROM lowstate_blocks),
+           (SELECT COUNT(*) FROM sportmodestate),
+           (SELECT COUNT(*) FROM errors),
+           (SELECT COUNT(*) FROM connection_state)
+""")
+lowstate_count, sportmodestate_count, error_count, conn_state_count = cursor.fetchone()
+print(f"Lowstate samples: {lowstate_count}")
 print(f"Sportmodestate rows: {sportmodestate_count}")
-
-cursor.execute("SELECT COUNT(*) FROM errors")
-error_count = cursor.fetchone()[0]
 print(f"Error rows: {error_count}")
-
-cursor.execute("SELECT COUNT(*) FROM connection_state")
-conn_state_count = cursor.fetchone()[0]
 print(f"Connection state rows: {conn_state_count}")
 print()
 
 # Get latest lowstate
 if lowstate_count > 0:
-    cursor.execute("SELECT timestamp, motor_state, bms_state FROM lowstate ORDER BY timestamp DESC LIMIT 1")
+    # The samples column comes back as bytes so it's parsed without a str round-trip
+    cursor.execute("SELECT timestamps, CAST(samples AS BLOB) "
+                   "FROM lowstate_blocks ORDER BY start_ts DESC LIMIT 1")
     row = cursor.fetchone()
     if row:
+        # Last sample of the newest block: its timestamp is the final float64
+        timestamp, = struct.unpack('<d', row[0][-8:])
+        motors, bms = json_loads(row[1])[-1][:2]
         print("Latest Lowstate:")
-        print(f"  Timestamp: {datetime.fromtimestamp(row[0]).strftime('%Y-%m-%d %H:%M:%S')}")
-        if row[1]:
-            motors = json.loads(row[1])
+        print(f"  Timestamp: {datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')}")
+        if motors:
             print(f"  Motor count: {len(motors)}")
-            if motors:
-                print(f"  First motor temp: {motors[0].get('temperature', 'N/A')}°C")
-        if row[2]:
-            bms = json.loads(row[2])
+            print(f"  First motor temp: {motors[0].get('temperature', 'N/A')}°C")
+        if bms:
             print(f"  BMS SOC: {bms.get('soc', 'N/A')}%")
         print()
 
@@ -472,19 +472,29 @@ class SensorMonitorApp(App):
                 if not pc:
                     raise RuntimeError("Peer connection not created")
                 
-                # Wait for connection
-                start_wait = time.time()
-                while True:
-                    state = getattr(pc, "connectionState", None)
-                    if state == "connected":
-                        if pc.remoteDescription:
-                            break
-                        raise RuntimeError("Connected but no remote description")
-                    if state in {"failed", "disconnected", "closed"}:
-                        raise RuntimeError(f"Connection state is {state}")
-                    if time.time() - start_wait > 3.0:
-                        raise RuntimeError("Connection state not progressing")
-                    await asyncio.sleep(0.05)
+                # Wait for connection, waking on each state change instead of polling
+                state_changed = asyncio.Event()
+                pc.on("connectionstatechange", state_changed.set)
+                deadline = time.monotonic() + 3.0
+                try:
+                    while True:
+                        state_changed.clear()
+                        state = pc.connectionState
+                        if state == "connected":
+                            if pc.remoteDescription:
+                                break
+                            raise RuntimeError("Connected but no remote description")
+                        if state in {"failed", "disconnected", "closed"}:
+                            raise RuntimeError(f"Connection state is {state}")
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise RuntimeError("Connection state not progressing")
+                        try:
+                            await asyncio.wait_for(state_changed.wait(), timeout=remaining)
+                        except asyncio.TimeoutError:
+                            raise RuntimeError("Connection state not progressing")
+                finally:
+                    pc.remove_listener("connectionstatechange", state_changed.set)
                 
                 log_to_file("Connection established")
                 self.connection_state = "Connected"
@@ -10,19 +10,30 @@ Usage:
 """
 
 import builtins as _builtins
-import re as _re
+import itertools as _itertools
 import os
 import sys
-from datetime import datetime
 from typing import Optional
 
 # Remove emojis from output for Windows terminal compatibility (for logging only)
 _builtin_print = _builtins.print
-emoji_pattern = _re.compile('[\U0001F300-\U0001FAD6\U0001FAE0-\U0001FAFF\U00002700-\U000027BF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\U0001F700-\U0001F77F\U0001F780-\U0001F7FF]+', flags=_re.UNICODE)
+# str.translate table deleting the emoji blocks (the other pictograph ranges
+# all fall inside 1F300-1FAD6)
+_EMOJI_TABLE = dict.fromkeys(_itertools.chain(
+    range(0x1F300, 0x1FAD7),
+    range(0x1FAE0, 0x1FB00),
+    range(0x2700, 0x27C0),
+))
 
 def _no_emoji_print(*args, **kwargs):
-    args = tuple(emoji_pattern.sub('', str(a)) for a in args)
-    return _builtin_print(*args, **kwargs)
+    cleaned_args = []
+    for a in args:
+        s = a if type(a) is str else str(a)
+        # Pure-ASCII strings (nearly every print) can't contain emoji
+        if not s.isascii():
+            s = s.translate(_EMOJI_TABLE)
+        cleaned_args.append(s)
+    return _builtin_print(*cleaned_args, **kwargs)
 
 _builtins.print = _no_emoji_print
 
@@ -34,14 +45,23 @@ if project_root not in sys.path:
 import asyncio
 import json
 import logging
+import re
 import time
 import signal
 import sqlite3
 import threading
+import traceback
 import argparse
+import atexit
+import contextlib
+import functools
+import queue
+import random
 from collections import defaultdict, deque
 from pathlib import Path
 
+import numpy as np
+
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical
 from textual.widgets import Static, Header, Footer, DataTable, Label
@@ -55,8 +75,41 @@ import go2_webrtc_driver.util as _util
 import go2_webrtc_driver.webrtc_datachannel as _webrtc_datachannel
 import go2_webrtc_driver.unitree_auth as _unitree_auth
 import go2_webrtc_driver.webrtc_driver as _webrtc_driver_mod
+import go2_webrtc_driver.msgs.error_handler as _error_handler
 from go2_webrtc_driver.msgs.error_handler import handle_error
 
+# orjson is optional; it encodes several times faster than json and returns UTF-8 bytes.
+# Message sizes come from these encoders rather than a walk over the nested
+# dicts: numba can't compile dict/str traversal, and the C encoders already
+# run it at native speed.
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+if HAVE_ORJSON:
+    json_loads = orjson.loads
+
+    def json_dumps(obj) -> str:
+        """Compact JSON text."""
+        return orjson.dumps(obj, default=str).decode()
+
+    def json_size(obj) -> int:
+        """Exact compact-JSON size of a message in bytes, from one C-encoder pass."""
+        return len(orjson.dumps(obj, default=str))
+else:
+    json_loads = json.loads
+
+    def json_dumps(obj) -> str:
+        """Compact JSON text."""
+        return json.dumps(obj, separators=(',', ':'), default=str)
+
+    def json_size(obj) -> int:
+        """Exact compact-JSON size of a message in bytes, from one C-encoder pass."""
+        # ensure_ascii (the default) keeps len(str) equal to the encoded byte count
+        return len(json_dumps(obj))
+
 # File logging (optional)
 log_file = os.path.join(os.path.dirname(__file__), 'sensor_log.txt')
 log_file_handle = None
@@ -67,15 +120,38 @@ LOG_HISTORY_SECONDS = 3.0
 LOG_HISTORY_MAX_ENTRIES = 1000
 log_buffer = deque()
 
+# The log file is flushed every LOG_FLUSH_EVERY lines or LOG_FLUSH_INTERVAL seconds,
+# not after every line
+LOG_FLUSH_EVERY = 50
+LOG_FLUSH_INTERVAL = 1.0
+_log_unflushed = 0
+_log_last_flush = 0.0
+
+
+# Timestamps repeat within a second across many messages, so the formatted
+# strings are cached per integer second
+@functools.lru_cache(maxsize=64)
+def _fmt_hms(ts_int: int) -> str:
+    """Format an integer epoch second as HH:MM:SS (local time)."""
+    return time.strftime('%H:%M:%S', time.localtime(ts_int))
+
+
+@functools.lru_cache(maxsize=64)
+def _fmt_full(ts_int: int) -> str:
+    """Format an integer epoch second as YYYY-mm-dd HH:MM:SS (local time)."""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts_int))
+
 def _append_log(message: str, already_formatted: bool = False) -> None:
     """Append log message to in-memory buffer and optionally to disk."""
+    global _log_unflushed, _log_last_flush
     timestamp = time.time()
     
     if already_formatted:
         log_entry = message
     else:
-        timestamp_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-        log_entry = f"[{timestamp_str}] {message}"
+        # Format the timestamp we already have instead of a second datetime.now()
+        timestamp_str = _fmt_full(int(timestamp))
+        log_entry = f"[{timestamp_str}.{int(timestamp % 1 * 1000):03d}] {message}"
     
     # Append to buffer
     log_buffer.append((timestamp, log_entry))
@@ -93,7 +169,11 @@ def _append_log(message: str, already_formatted: bool = False) -> None:
     if LOG_TO_FILE_ENABLED and log_file_handle:
         try:
             log_file_handle.write(log_entry + '\n')
-            log_file_handle.flush()
+            _log_unflushed += 1
+            if _log_unflushed >= LOG_FLUSH_EVERY or timestamp - _log_last_flush >= LOG_FLUSH_INTERVAL:
+                log_file_handle.flush()
+                _log_unflushed = 0
+                _log_last_flush = timestamp
         except Exception:
             pass
 
@@ -140,7 +220,7 @@ def enable_file_logging():
 
 # Monkey-patch print_status to only log to file (no console output)
 def _patched_print_status(status_type, status_message):
-    current_time = time.strftime("%H:%M:%S")
+    current_time = _fmt_hms(int(time.time()))
     msg = f"[{current_time}] {status_type}: {status_message}"
     log_to_file(msg)
 
@@ -158,66 +238,89 @@ _connection_print = _silent_print
 
 # Extended timeout for data channel
 _orig_wait_datachannel_open = _webrtc_datachannel.WebRTCDataChannel.wait_datachannel_open
+_orig_datachannel_init = _webrtc_datachannel.WebRTCDataChannel.__init__
+
+def _patched_datachannel_init(self, conn, pc):
+    """Attach an event that the channel's 'open' handler sets."""
+    _orig_datachannel_init(self, conn, pc)
+    self._open_event = asyncio.Event()
+    self.channel.on("open", self._open_event.set)
+
+_webrtc_datachannel.WebRTCDataChannel.__init__ = _patched_datachannel_init
+
+async def _log_datachannel_wait(channel):
+    """Log the channel state every 2s until cancelled."""
+    while True:
+        log_to_file(f"Waiting for datachannel readyState= {getattr(channel, 'readyState', None)}")
+        await asyncio.sleep(2.0)
 
 async def _patched_wait_datachannel_open(self, timeout=5):
-    """Extended wait for data channel with better logging."""
-    deadline = time.time() + 30.0
-    last_log = 0
-    while time.time() < deadline:
-        if getattr(self, "data_channel_opened", False):
-            return
-        channel = getattr(self, "channel", None)
-        state = getattr(channel, "readyState", None)
-        if state == "open":
-            return
-        if time.time() - last_log >= 2.0:
-            log_to_file(f"Waiting for datachannel readyState= {state}")
-            last_log = time.time()
-        await asyncio.sleep(0.1)
-    log_to_file("Warning: data channel did not report open within 30s; continuing anyway")
+    """Extended wait for data channel with better logging, woken by its 'open' event."""
+    channel = getattr(self, "channel", None)
+    if getattr(self, "data_channel_opened", False) or getattr(channel, "readyState", None) == "open":
+        return
+    open_event = getattr(self, "_open_event", None)
+    if open_event is None:
+        # Channel created before the __init__ patch was installed
+        open_event = self._open_event = asyncio.Event()
+        channel.on("open", open_event.set)
+    log_task = asyncio.create_task(_log_datachannel_wait(channel))
+    try:
+        await asyncio.wait_for(open_event.wait(), timeout=30.0)
+    except asyncio.TimeoutError:
+        log_to_file("Warning: data channel did not report open within 30s; continuing anyway")
+    finally:
+        log_task.cancel()
 
 _webrtc_datachannel.WebRTCDataChannel.wait_datachannel_open = _patched_wait_datachannel_open
 
 # SDP patches
 _orig_send_local = _unitree_auth.send_sdp_to_local_peer
 
-def _rewrite_sdp_to_legacy(sdp: str) -> str:
-    """Rewrite SDP from RFC 8841 format to legacy format for aiortc compatibility."""
+_LEGACY_SCTPMAP = "a=sctpmap:5000 webrtc-datachannel 65535"
+# Every line kind the rewrite touches, as one alternation dispatched on lastgroup,
+# so the SDP is walked once instead of four startswith checks per line plus a
+# separate fingerprint-filter pass. Fingerprint matches take their line ending
+# with them so they can be dropped outright.
+_SDP_REWRITE_RE = re.compile(
+    r"^(?:(?P<fingerprint>a=fingerprint:sha-(?:384|512))[^\r\n]*(?:\r?\n)?"
+    r"|(?P<m_application>m=application(?:[ \t]+(?P<port>\S+))?[^\r\n]*)"
+    r"|(?P<sctp_port>a=sctp-port)[^\r\n]*"
+    r"|(?P<sctpmap>a=sctpmap)[^\r\n]*)",
+    re.MULTILINE,
+)
+
+def _rewrite_sdp_to_legacy(sdp: str, strip_strong_fingerprints: bool = False) -> str:
+    """Rewrite SDP from RFC 8841 format to legacy format for aiortc compatibility.
+
+    With strip_strong_fingerprints, sha-384/sha-512 fingerprint lines are removed
+    in the same pass.
+    """
     if not isinstance(sdp, str):
         return sdp
-    lines = []
-    saw_m_application = False
-    saw_sctpmap = False
-    for line in sdp.splitlines():
-        if line.startswith("m=application"):
-            parts = line.split()
-            port = parts[1] if len(parts) > 1 else "9"
-            lines.append(f"m=application {port} UDP/DTLS/SCTP 5000")
-            saw_m_application = True
-        elif line.startswith("a=sctp-port"):
-            lines.append("a=sctpmap:5000 webrtc-datachannel 65535")
-            saw_sctpmap = True
-        elif line.startswith("a=sctpmap"):
-            lines.append(line)
-            saw_sctpmap = True
-        else:
-            lines.append(line)
-    if saw_m_application and not saw_sctpmap:
-        lines.append("a=sctpmap:5000 webrtc-datachannel 65535")
-    return "\r\n".join(lines) + "\r\n"
+    saw = {"m_application": False, "sctpmap": False}
+
+    def repl(m):
+        kind = m.lastgroup
+        if kind == "fingerprint":
+            return "" if strip_strong_fingerprints else m.group(0)
+        if kind == "m_application":
+            saw["m_application"] = True
+            return f"m=application {m.group('port') or '9'} UDP/DTLS/SCTP 5000"
+        saw["sctpmap"] = True
+        return _LEGACY_SCTPMAP if kind == "sctp_port" else m.group(0)
+
+    sdp = _SDP_REWRITE_RE.sub(repl, sdp).rstrip("\r\n") + "\r\n"
+    if saw["m_application"] and not saw["sctpmap"]:
+        sdp += _LEGACY_SCTPMAP + "\r\n"
+    return sdp
 
 def _patched_send_sdp(ip, sdp):
     """Patch SDP exchange to strip problematic fingerprints and rewrite to legacy format."""
     try:
-        payload = json.loads(sdp)
-        offer_sdp = payload.get("sdp", "")
-        filtered = [
-            line for line in offer_sdp.splitlines()
-            if not line.startswith("a=fingerprint:sha-384")
-            and not line.startswith("a=fingerprint:sha-512")
-        ]
-        payload["sdp"] = _rewrite_sdp_to_legacy("\r\n".join(filtered) + "\r\n")
-        sdp = json.dumps(payload)
+        payload = json_loads(sdp)
+        payload["sdp"] = _rewrite_sdp_to_legacy(payload.get("sdp", ""), strip_strong_fingerprints=True)
+        sdp = json_dumps(payload)
     except Exception:
         pass
     return _orig_send_local(ip, sdp)
@@ -252,7 +355,7 @@ async def _patched_get_answer_from_local_peer(self, pc, ip):
             "type": pc.localDescription.type,
             "token": self.token
         }
-        peer_answer_json = _patched_send_sdp(ip, json.dumps(offer_dict))
+        peer_answer_json = _patched_send_sdp(ip, json_dumps(offer_dict))
         return peer_answer_json
     return await _orig_get_answer_from_local_peer(self, pc, ip)
 
@@ -265,12 +368,28 @@ conn: Optional[Go2WebRTCConnection] = None
 TEST_MODE = False
 ENABLE_DB = False  # Database logging disabled by default for performance
 ENABLE_VERBOSE_LOGGING = False  # Verbose file logging disabled by default
+CALLBACK_LOG_INTERVAL = 1.0  # Seconds between sensor callback log lines when not verbose
+POLL_FAILURE_LOG_INTERVAL = 10.0  # Seconds between logged UI refresh failures
+
+# Keepalive loop schedule (seconds)
+CONNECTION_CHECK_INTERVAL = 1.0  # Health check + connection details refresh for the UI
+KEEPALIVE_INTERVAL = 20.0  # Active keepalive (matching lidar2)
+STATUS_LOG_INTERVAL = 30.0  # "Connection stable" log line
+
+# Reconnect backoff: exponential with full jitter, so units sharing an AP that
+# drop together don't retry in lockstep
+RECONNECT_BACKOFF_BASE = 1.0
+RECONNECT_BACKOFF_CAP = 30.0
+MAX_CONSECUTIVE_FAILURES = 50  # Give up (Terminal state) after this many failures in a row
 
-# In-memory data store (thread-safe with lock)
+# In-memory data store. 'lowstate', 'sportmodestate' and 'errors' are written
+# without the lock: writers build a fresh snapshot dict and swap the reference in
+# with a single (atomic) item assignment, and deque.append is atomic too.
+# connection_details is mutated in place, so it stays under memory_lock.
 memory_store = {
     'lowstate': None,
     'sportmodestate': None,
-    'errors': [],
+    'errors': deque(maxlen=100),  # Last 100 errors only, to prevent memory bloat
     'connection_state': 'Disconnected',
     'connection_details': {
         'ice_connection_state': 'unknown',
@@ -285,44 +404,107 @@ memory_store = {
         'last_lowstate_time': None,
         'last_sportmode_time': None,
     },
-    'error_count': 0
 }
 memory_lock = threading.Lock()
 
 # Bandwidth tracking (thread-safe with lock)
-bandwidth_data = {
-    'samples': []  # List of (timestamp, bytes) tuples - keep only recent samples
-}
-bandwidth_lock = threading.Lock()
 MAX_BANDWIDTH_SAMPLES = 50  # Keep last 50 samples (~5 seconds) - reduced to prevent buffer bloat
+BANDWIDTH_WINDOW = 1.0  # Seconds of samples that make up the bandwidth figure
+bandwidth_samples = deque()  # (monotonic time, bytes) within the last BANDWIDTH_WINDOW, oldest first
+bandwidth_bytes = 0  # Running total of the bytes in bandwidth_samples
+bandwidth_lock = threading.Lock()
+
+def _expire_bandwidth_samples(cutoff):
+    """Drop samples older than cutoff or beyond MAX_BANDWIDTH_SAMPLES. Caller holds bandwidth_lock."""
+    global bandwidth_bytes
+    while bandwidth_samples and (bandwidth_samples[0][0] < cutoff
+                                 or len(bandwidth_samples) > MAX_BANDWIDTH_SAMPLES):
+        bandwidth_bytes -= bandwidth_samples.popleft()[1]
+
+def record_bandwidth(timestamp, nbytes):
+    """Add a received message to the bandwidth window."""
+    global bandwidth_bytes
+    with bandwidth_lock:
+        bandwidth_samples.append((timestamp, nbytes))
+        bandwidth_bytes += nbytes
+        _expire_bandwidth_samples(timestamp - BANDWIDTH_WINDOW)
 
 # SQLite database setup (only used if ENABLE_DB is True)
 db_path = os.path.join(os.path.dirname(__file__), 'sensor_data.db')
 db_lock = threading.Lock()
 
+# One persistent connection per writer thread instead of a connect/close per row
+_db_local = threading.local()
+_db_connections = []  # Every connection opened by _get_db(), for close_database()
+_db_generation = 0  # Bumped by close_database() so threads reopen instead of using a closed handle
+
+def _get_db():
+    """Return this thread's database connection, opening it on first use."""
+    conn_db = getattr(_db_local, 'conn', None)
+    if conn_db is None or _db_local.generation != _db_generation:
+        conn_db = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL + synchronous=NORMAL: commits append to the log without an fsync each
+        conn_db.execute('PRAGMA journal_mode=WAL')
+        conn_db.execute('PRAGMA synchronous=NORMAL')
+        conn_db.execute('PRAGMA temp_store=MEMORY')
+        conn_db.execute('PRAGMA cache_size=-65536')
+        _db_local.conn = conn_db
+        _db_local.generation = _db_generation
+        with db_lock:
+            _db_connections.append(conn_db)
+    return conn_db
+
+def close_database():
+    """Flush queued rows, then close every connection opened by _get_db()."""
+    global _db_generation
+    _stop_db_writer()
+    with db_lock:
+        connections = _db_connections[:]
+        _db_connections.clear()
+        _db_generation += 1
+    for conn_db in connections:
+        try:
+            conn_db.close()
+        except Exception:
+            pass
+
+def remove_database_files():
+    """Close connections and delete the database along with its WAL side files."""
+    close_database()
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+
+atexit.register(close_database)
+
 def init_database():
     """Initialize SQLite database (only if ENABLE_DB is True)."""
     if not ENABLE_DB:
         return None
     
-    conn_db = sqlite3.connect(db_path, check_same_thread=False)
+    conn_db = _get_db()
     cursor = conn_db.cursor()
     
-    # Create tables
+    # Create tables. Plain INTEGER PRIMARY KEY aliases the rowid; AUTOINCREMENT
+    # would add a sqlite_sequence update to every insert for no benefit here.
+    # Lowstate arrives at ~20 Hz, so it is stored as one row per second of samples:
+    #   timestamps - count little-endian float64
+    #   motors     - little-endian float32 [3][count][MOTOR_COUNT]: temperature, q, lost
+    #                (NaN where a sample had fewer motors)
+    #   samples    - JSON [[motor_state, bms_state, imu_state, foot_force], ...]
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS lowstate (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp REAL,
-            motor_state TEXT,
-            bms_state TEXT,
-            imu_state TEXT,
-            foot_force TEXT
+        CREATE TABLE IF NOT EXISTS lowstate_blocks (
+            start_ts REAL PRIMARY KEY,
+            count INTEGER,
+            timestamps BLOB,
+            motors BLOB,
+            samples TEXT
         )
     ''')
     
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS sportmodestate (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             timestamp REAL,
             mode INTEGER,
             progress REAL,
@@ -335,7 +517,7 @@ def init_database():
     
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS errors (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             timestamp REAL,
             error_source INTEGER,
             error_code INTEGER,
@@ -345,184 +527,267 @@ def init_database():
     
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS connection_state (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            id INTEGER PRIMARY KEY,
             timestamp REAL,
             state TEXT
         )
     ''')
     
     conn_db.commit()
+    _start_db_writer()
     return conn_db
 
+# Writers only enqueue (table, timestamp, payload); the writer thread serializes
+# the rows and commits them in batches, one transaction per batch
+DB_BATCH_MAX_ROWS = 500
+DB_BATCH_MAX_DELAY = 0.2  # seconds
+_db_queue = queue.SimpleQueue()
+_db_writer_thread = None
+
+LOWSTATE_BLOCK_SECONDS = 1.0  # Span of lowstate samples packed into one lowstate_blocks row
+_lowstate_block = []  # (timestamp, data) not yet written; only touched by the writer thread
+
+# Message-backed tables: (data key, JSON-encode?) per column after timestamp.
+# Only sportmodestate stores one row per message now (lowstate is packed into
+# lowstate_blocks); its row builder is generated with the keys and defaults
+# inlined, instead of looping over the schema for every row.
+_MESSAGE_TABLE_SCHEMAS = {
+    'sportmodestate': (
+        ('mode', False),
+        ('progress', False),
+        ('body_height', False),
+        ('position', True),
+        ('velocity', True),
+        ('imu_state', True),
+    ),
+}
+# JSON columns default to an empty container of the shape the robot sends
+_JSON_DEFAULTS = {'imu_state': '{}'}
+
+def _compile_row_builder(table, columns):
+    """Generate row(ts, d) -> tuple for a message table."""
+    exprs = []
+    for key, encode in columns:
+        if encode:
+            exprs.append(f"json_dumps(d.get({key!r}, {_JSON_DEFAULTS.get(key, '[]')}))")
+        else:
+            exprs.append(f"d.get({key!r})")
+    src = f"def row(ts, d):\n    return (ts, {', '.join(exprs)})\n"
+    namespace = {'json_dumps': json_dumps}
+    exec(compile(src, f"<{table}_row>", "exec"), namespace)
+    return namespace['row']
+
+def _insert_sql(table, columns):
+    return (f"INSERT INTO {table} (timestamp, {', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * (len(columns) + 1))})")
+
+_INSERT_SQL = {
+    table: _insert_sql(table, [key for key, _ in columns])
+    for table, columns in _MESSAGE_TABLE_SCHEMAS.items()
+}
+_INSERT_SQL['lowstate_blocks'] = ('INSERT INTO lowstate_blocks (start_ts, count, timestamps, motors, samples) '
+                                  'VALUES (?, ?, ?, ?, ?)')
+_INSERT_SQL['errors'] = _insert_sql('errors', ['error_source', 'error_code', 'error_data'])
+_INSERT_SQL['connection_state'] = _insert_sql('connection_state', ['state'])
+
+_ROW_BUILDERS = {
+    table: _compile_row_builder(table, columns)
+    for table, columns in _MESSAGE_TABLE_SCHEMAS.items()
+}
+_ROW_BUILDERS['errors'] = lambda ts, err: (ts, err[0], err[1], json_dumps(err[2]))
+_ROW_BUILDERS['connection_state'] = lambda ts, state: (ts, state)
+
+def _lowstate_block_row(samples):
+    """Pack buffered (timestamp, data) lowstate samples into one lowstate_blocks row."""
+    count = len(samples)
+    timestamps = np.fromiter((ts for ts, _ in samples), dtype='<f8', count=count)
+    motors = np.full((3, count, MOTOR_COUNT), np.nan, dtype='<f4')
+    bad_samples = 0
+    for j, (_, data) in enumerate(samples):
+        # A sample with non-numeric motor fields keeps NaN lanes; the rest of the
+        # block (and its raw JSON) is still written
+        try:
+            columns = motor_columns(data.get('motor_state', []))
+        except (TypeError, ValueError):
+            bad_samples += 1
+            continue
+        motors[:, j, :len(columns[0])] = columns
+    if bad_samples:
+        log_to_file(f"WARNING: {bad_samples}/{count} lowstate samples had non-numeric motor data")
+    payload = json_dumps([
+        [data.get('motor_state', []), data.get('bms_state', {}),
+         data.get('imu_state', {}), data.get('foot_force', [])]
+        for _, data in samples
+    ])
+    return (timestamps[0], count, timestamps.tobytes(), motors.tobytes(), payload)
+
+def _flush_db_batch(batch, final=False):
+    """Serialize a batch of queued rows and insert them in a single transaction.
+
+    Lowstate samples are held back until they span LOWSTATE_BLOCK_SECONDS (or
+    final is set) and then written as a single lowstate_blocks row.
+    """
+    rows = defaultdict(list)
+
+    def close_lowstate_block():
+        try:
+            rows['lowstate_blocks'].append(_lowstate_block_row(_lowstate_block))
+        except Exception as e:
+            log_to_file(f"ERROR packing lowstate block for DB: {e}")
+        _lowstate_block.clear()
+
+    for table, timestamp, payload in batch:
+        if table == 'lowstate':
+            if _lowstate_block and timestamp - _lowstate_block[0][0] >= LOWSTATE_BLOCK_SECONDS:
+                close_lowstate_block()
+            _lowstate_block.append((timestamp, payload))
+            continue
+        try:
+            rows[table].append(_ROW_BUILDERS[table](timestamp, payload))
+        except Exception as e:
+            log_to_file(f"ERROR serializing {table} row for DB: {e}")
+    if final and _lowstate_block:
+        close_lowstate_block()
+    if not rows:
+        return
+    try:
+        conn_db = _get_db()
+        # The INSERT strings stay in the connection's statement cache, so
+        # executemany reuses their prepared statements across batches
+        with conn_db:
+            # Take the write lock up front rather than upgrading mid-batch
+            conn_db.execute('BEGIN IMMEDIATE')
+            for table, table_rows in rows.items():
+                conn_db.executemany(_INSERT_SQL[table], table_rows)
+    except Exception as e:
+        log_to_file(f"ERROR writing {len(batch)} rows to DB: {e}")
+
+def _db_writer_loop():
+    """Drain the row queue in batches of up to DB_BATCH_MAX_ROWS or DB_BATCH_MAX_DELAY."""
+    while True:
+        item = _db_queue.get()
+        if item is None:
+            _flush_db_batch([], final=True)
+            return
+        batch = [item]
+        stop = False
+        deadline = time.monotonic() + DB_BATCH_MAX_DELAY
+        while len(batch) < DB_BATCH_MAX_ROWS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _db_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        _flush_db_batch(batch, final=stop)
+        if stop:
+            return
+
+def _start_db_writer():
+    """Start the batching writer thread if it isn't running."""
+    global _db_writer_thread
+    if _db_writer_thread is None or not _db_writer_thread.is_alive():
+        _db_writer_thread = threading.Thread(target=_db_writer_loop, name="sensor-db-writer", daemon=True)
+        _db_writer_thread.start()
+
+def _stop_db_writer():
+    """Stop the writer thread after it has flushed everything queued so far."""
+    global _db_writer_thread
+    if _db_writer_thread is not None and _db_writer_thread.is_alive():
+        _db_queue.put(None)
+        _db_writer_thread.join(timeout=5.0)
+    _db_writer_thread = None
+
+MOTOR_COUNT = 12  # Go2 leg motors, the ones the motor table shows
+
+def motor_columns(motor_state):
+    """Split per-motor dicts into contiguous (temperature, q, lost) float64 columns."""
+    rows = [(m.get('temperature', 0), m.get('q', 0), m.get('lost', 0)) for m in motor_state[:MOTOR_COUNT]]
+    temps, qs, losts = np.ascontiguousarray(np.array(rows, dtype=np.float64).reshape(-1, 3).T)
+    return temps, qs, losts
+
 def write_lowstate(data):
     """Write lowstate data to in-memory store and optionally to database."""
-    # Estimate data size (fast approximation without full JSON serialization)
-    # Rough estimate: count dict/list items and multiply by average size
-    def estimate_size(obj):
-        if isinstance(obj, dict):
-            return sum(estimate_size(v) for v in obj.values()) + len(obj) * 10
-        elif isinstance(obj, list):
-            return sum(estimate_size(item) for item in obj) + len(obj) * 5
-        elif isinstance(obj, (int, float)):
-            return 8
-        elif isinstance(obj, str):
-            return len(obj)
-        else:
-            return 20  # Default estimate
-    data_size = estimate_size(data)
+    data_size = json_size(data)
     
-    # Track bandwidth (minimal lock time, efficient cleanup)
-    current_time = time.time()
-    with bandwidth_lock:
-        bandwidth_data['samples'].append((current_time, data_size))
-        # Clean old samples efficiently - only clean if we're over limit
-        # This avoids expensive list comprehension on every write
-        if len(bandwidth_data['samples']) > MAX_BANDWIDTH_SAMPLES:
-            cutoff_time = current_time - 2.0
-            # Remove old samples from front (they're in chronological order)
-            while bandwidth_data['samples'] and bandwidth_data['samples'][0][0] < cutoff_time:
-                bandwidth_data['samples'].pop(0)
-            # Also enforce max length as safety
-            if len(bandwidth_data['samples']) > MAX_BANDWIDTH_SAMPLES:
-                bandwidth_data['samples'] = bandwidth_data['samples'][-MAX_BANDWIDTH_SAMPLES:]
+    # One wall-clock reading serves the stored and DB timestamps; bandwidth
+    # is a rate, so it runs on the monotonic clock
+    now = time.time()
+    record_bandwidth(time.monotonic(), data_size)
     
     # Always update in-memory store (best-effort, non-blocking)
     try:
-        with memory_lock:
-            # Only store essential data, don't accumulate
-            memory_store['lowstate'] = {
-                'motor_state': data.get('motor_state', [])[:20],  # Limit motor count
-                'bms_state': data.get('bms_state', {}),
-                'imu_state': data.get('imu_state', {}),
-                'foot_force': data.get('foot_force', [])[:4],  # Limit foot force count
-                'timestamp': time.time()
-            }
+        # Only store essential data, don't accumulate; published by reference swap
+        memory_store['lowstate'] = {
+            'motors': motor_columns(data.get('motor_state', [])),  # (temps, qs, losts) columns
+            'bms_state': data.get('bms_state', {}),
+            'imu_state': data.get('imu_state', {}),
+            'foot_force': data.get('foot_force', [])[:4],  # Limit foot force count
+            'timestamp': now
+        }
     except Exception:
-        pass  # Skip update if lock is held too long or data is bad
+        pass  # Skip update if data is bad
     
     # Optionally write to database
     if ENABLE_DB:
-        try:
-            conn_db = sqlite3.connect(db_path, check_same_thread=False)
-            cursor = conn_db.cursor()
-            
-            cursor.execute('''
-                INSERT INTO lowstate (timestamp, motor_state, bms_state, imu_state, foot_force)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (
-                time.time(),
-                json.dumps(data.get('motor_state', [])),
-                json.dumps(data.get('bms_state', {})),
-                json.dumps(data.get('imu_state', {})),
-                json.dumps(data.get('foot_force', []))
-            ))
-            
-            conn_db.commit()
-            conn_db.close()
-        except Exception as e:
-            log_to_file(f"ERROR writing lowstate to DB: {e}")
+        _db_queue.put(('lowstate', now, data))
 
 def write_sportmodestate(data):
     """Write sport mode state to in-memory store and optionally to database."""
-    # Estimate data size (fast approximation without full JSON serialization)
-    def estimate_size(obj):
-        if isinstance(obj, dict):
-            return sum(estimate_size(v) for v in obj.values()) + len(obj) * 10
-        elif isinstance(obj, list):
-            return sum(estimate_size(item) for item in obj) + len(obj) * 5
-        elif isinstance(obj, (int, float)):
-            return 8
-        elif isinstance(obj, str):
-            return len(obj)
-        else:
-            return 20  # Default estimate
-    data_size = estimate_size(data)
+    data_size = json_size(data)
     
-    # Track bandwidth (minimal lock time, efficient cleanup)
-    current_time = time.time()
-    with bandwidth_lock:
-        bandwidth_data['samples'].append((current_time, data_size))
-        # Clean old samples efficiently - only clean if we're over limit
-        # This avoids expensive list comprehension on every write
-        if len(bandwidth_data['samples']) > MAX_BANDWIDTH_SAMPLES:
-            cutoff_time = current_time - 2.0
-            # Remove old samples from front (they're in chronological order)
-            while bandwidth_data['samples'] and bandwidth_data['samples'][0][0] < cutoff_time:
-                bandwidth_data['samples'].pop(0)
-            # Also enforce max length as safety
-            if len(bandwidth_data['samples']) > MAX_BANDWIDTH_SAMPLES:
-                bandwidth_data['samples'] = bandwidth_data['samples'][-MAX_BANDWIDTH_SAMPLES:]
+    # One wall-clock reading serves the stored and DB timestamps; bandwidth
+    # is a rate, so it runs on the monotonic clock
+    now = time.time()
+    record_bandwidth(time.monotonic(), data_size)
     
     # Always update in-memory store (best-effort, non-blocking)
     try:
-        with memory_lock:
-            # Only store essential data, limit array sizes
-            memory_store['sportmodestate'] = {
-                'mode': data.get('mode'),
-                'progress': data.get('progress'),
-                'body_height': data.get('body_height'),
-                'position': (data.get('position', []) or [])[:3],  # Limit to 3 elements
-                'velocity': (data.get('velocity', []) or [])[:3],  # Limit to 3 elements
-                'imu_state': data.get('imu_state', {}),
-                'timestamp': time.time()
-            }
+        # Only store essential data, limit array sizes; published by reference swap
+        memory_store['sportmodestate'] = {
+            'mode': data.get('mode'),
+            'progress': data.get('progress'),
+            'body_height': data.get('body_height'),
+            'position': (data.get('position', []) or [])[:3],  # Limit to 3 elements
+            'velocity': (data.get('velocity', []) or [])[:3],  # Limit to 3 elements
+            'imu_state': data.get('imu_state', {}),
+            'timestamp': now
+        }
     except Exception:
-        pass  # Skip update if lock is held too long or data is bad
+        pass  # Skip update if data is bad
     
     # Optionally write to database
     if ENABLE_DB:
-        try:
-            conn_db = sqlite3.connect(db_path, check_same_thread=False)
-            cursor = conn_db.cursor()
-            
-            cursor.execute('''
-                INSERT INTO sportmodestate (timestamp, mode, progress, body_height, position, velocity, imu_state)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                time.time(),
-                data.get('mode'),
-                data.get('progress'),
-                data.get('body_height'),
-                json.dumps(data.get('position', [])),
-                json.dumps(data.get('velocity', [])),
-                json.dumps(data.get('imu_state', {}))
-            ))
-            
-            conn_db.commit()
-            conn_db.close()
-        except Exception as e:
-            log_to_file(f"ERROR writing sportmodestate to DB: {e}")
+        _db_queue.put(('sportmodestate', now, data))
 
 def write_error(error_source, error_code, error_data):
     """Write error to in-memory store and optionally to database."""
-    # Always update in-memory store (limit error list to prevent unbounded growth)
-    with memory_lock:
-        memory_store['errors'].append({
-            'timestamp': time.time(),
-            'error_source': error_source,
-            'error_code': error_code,
-            'error_data': error_data
-        })
-        # Limit error list to last 100 errors to prevent memory bloat
-        if len(memory_store['errors']) > 100:
-            memory_store['errors'] = memory_store['errors'][-100:]
-        memory_store['error_count'] = len(memory_store['errors'])
+    write_errors_batch([(error_source, error_code, error_data)])
+
+def write_errors_batch(rows):
+    """Write (error_source, error_code, error_data) rows from one error message at once.
+
+    The rows share a timestamp and reach the database writer together, so a burst
+    of errors lands in a single executemany/transaction.
+    """
+    now = time.time()
+    # Always update in-memory store (the deque's maxlen bounds it)
+    memory_store['errors'].extend({
+        'timestamp': now,
+        'error_source': error_source,
+        'error_code': error_code,
+        'error_data': error_data
+    } for error_source, error_code, error_data in rows)
     
     # Optionally write to database
     if ENABLE_DB:
-        try:
-            conn_db = sqlite3.connect(db_path, check_same_thread=False)
-            cursor = conn_db.cursor()
-            
-            cursor.execute('''
-                INSERT INTO errors (timestamp, error_source, error_code, error_data)
-                VALUES (?, ?, ?, ?)
-            ''', (time.time(), error_source, error_code, json.dumps(error_data)))
-            
-            conn_db.commit()
-            conn_db.close()
-        except Exception as e:
-            log_to_file(f"ERROR writing error to DB: {e}")
+        for row in rows:
+            _db_queue.put(('errors', now, row))
 
 def write_connection_state(state):
     """Write connection state to in-memory store and optionally to database."""
@@ -532,34 +797,19 @@ def write_connection_state(state):
     
     # Optionally write to database
     if ENABLE_DB:
-        try:
-            conn_db = sqlite3.connect(db_path, check_same_thread=False)
-            cursor = conn_db.cursor()
-            
-            cursor.execute('''
-                INSERT INTO connection_state (timestamp, state)
-                VALUES (?, ?)
-            ''', (time.time(), state))
-            
-            conn_db.commit()
-            conn_db.close()
-        except Exception as e:
-            log_to_file(f"ERROR writing connection state to DB: {e}")
+        _db_queue.put(('connection_state', time.time(), state))
 
 def get_latest_lowstate():
     """Get latest lowstate data from in-memory store."""
-    with memory_lock:
-        return memory_store['lowstate']
+    return memory_store['lowstate']
 
 def get_latest_sportmodestate():
     """Get latest sport mode state from in-memory store."""
-    with memory_lock:
-        return memory_store['sportmodestate']
+    return memory_store['sportmodestate']
 
 def get_error_count():
     """Get count of errors from in-memory store."""
-    with memory_lock:
-        return memory_store['error_count']
+    return len(memory_store['errors'])
 
 def get_latest_connection_state():
     """Get latest connection state from in-memory store."""
@@ -579,6 +829,16 @@ def update_connection_details(**kwargs):
     except Exception:
         pass  # Non-blocking
 
+async def _wait_any(*events, timeout=None):
+    """Wait until any of the asyncio.Events is set; return False on timeout."""
+    waiters = [asyncio.create_task(event.wait()) for event in events]
+    try:
+        done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+    return bool(done)
+
 def get_datachannel_state(conn) -> str:
     """Best-effort helper to determine the RTCDataChannel ready state."""
     try:
@@ -602,22 +862,14 @@ def get_datachannel_state(conn) -> str:
 def get_bandwidth_kbps():
     """Calculate current bandwidth in kb/s based on recent samples (accurate, no caps)."""
     try:
-        # Make a quick copy of samples to minimize lock time
+        # The window and its byte total are maintained incrementally, so this is O(1)
+        # apart from evicting samples that aged out since the last write
         with bandwidth_lock:
-            if len(bandwidth_data['samples']) < 2:
+            _expire_bandwidth_samples(time.monotonic() - BANDWIDTH_WINDOW)
+            if len(bandwidth_samples) < 2:
                 return 0.0
-            # Copy only recent samples (last 1 second worth)
-            current_time = time.time()
-            one_second_ago = current_time - 1.0
-            samples = [(t, b) for t, b in bandwidth_data['samples'] if t >= one_second_ago]
-        
-        # Calculate outside the lock
-        if len(samples) < 2:
-            return 0.0
-        
-        # Calculate bandwidth from recent samples
-        total_bytes = sum(b for _, b in samples)
-        time_span = samples[-1][0] - samples[0][0] if len(samples) > 1 else 1.0
+            total_bytes = bandwidth_bytes
+            time_span = bandwidth_samples[-1][0] - bandwidth_samples[0][0]
         
         # Only reject if time_span is invalid (negative or zero)
         if time_span <= 0:
@@ -646,55 +898,57 @@ class MotorTable(DataTable):
     ]
     
     def on_mount(self) -> None:
-        self.add_columns("Motor", "Temp (°C)", "Position", "Lost")
-        for i in range(12):
-            label = self.MOTOR_LABELS[i] if i < len(self.MOTOR_LABELS) else f"M{i+1}"
-            self.add_row(label, "—", "—", "—")
-    
-    def update_motors(self, motor_state):
-        """Update motor data."""
-        # Only show first 12 motors (Go2 has 12 leg motors)
-        motors_to_show = motor_state[:12] if len(motor_state) > 12 else motor_state
-        
+        self._labels = tuple(self.MOTOR_LABELS[i] if i < len(self.MOTOR_LABELS) else f"M{i+1}"
+                             for i in range(12))
+        self._column_keys = self.add_columns("Motor", "Temp (°C)", "Position", "Lost")
+        self._row_keys = [self.add_row(label, "—", "—", "—") for label in self._labels]
+        # Last (temp, position, lost) strings written per row, so unchanged cells are skipped
+        self._last_cells = [("—", "—", "—")] * 12
+    
+    def _set_row(self, i, cells):
+        """Write the changed cells of row i in place."""
+        last = self._last_cells[i]
+        if cells == last:
+            return
+        row_key = self._row_keys[i]
+        for column_key, value, old in zip(self._column_keys[1:], cells, last):
+            if value != old:
+                self.update_cell(row_key, column_key, value)
+        self._last_cells[i] = cells
+    
+    # Temperature colour bands, checked hottest first; the last format is the default
+    TEMP_THRESHOLDS = (80, 70, 60)
+    TEMP_FORMATS = (
+        "[red]{:g}°C[/red]",
+        "[yellow]{:g}°C[/yellow]",
+        "[bright_yellow]{:g}°C[/bright_yellow]",
+        "{:g}°C",
+    )
+    
+    def update_motors(self, temps, qs, losts):
+        """Update motor data from the (temperature, q, lost) columns."""
         try:
-            # Clear existing rows and re-add with updated data
-            # Note: This is necessary because Textual's update_cell doesn't work reliably
-            # The clear/re-add is fast enough for 12 rows at 20 Hz
-            self.clear()
-            self.add_columns("Motor", "Temp (°C)", "Position", "Lost")
+            # Colour band per motor for the whole column at once
+            bands = np.select([temps >= t for t in self.TEMP_THRESHOLDS],
+                              range(len(self.TEMP_THRESHOLDS)), len(self.TEMP_THRESHOLDS))
             
-            for i, motor in enumerate(motors_to_show):
-                if i >= 12:  # Safety check
-                    break
-                try:
-                    temp = motor.get('temperature', 0)
-                    q = motor.get('q', 0)
-                    lost = motor.get('lost', 0)
-                    
-                    # Get motor label
-                    label = self.MOTOR_LABELS[i] if i < len(self.MOTOR_LABELS) else f"M{i+1}"
-                    
-                    # Color code temperature
-                    if temp >= 80:
-                        temp_str = f"[red]{temp}°C[/red]"
-                    elif temp >= 70:
-                        temp_str = f"[yellow]{temp}°C[/yellow]"
-                    elif temp >= 60:
-                        temp_str = f"[bright_yellow]{temp}°C[/bright_yellow]"
-                    else:
-                        temp_str = f"{temp}°C"
-                    
-                    lost_str = f"[red]{lost}[/red]" if lost > 0 else str(lost)
-                    
-                    self.add_row(label, temp_str, f"{q:.4f}", lost_str)
-                except Exception as e:
-                    log_to_file(f"ERROR adding motor row {i}: {e}")
-                    # Add row with error indicator
-                    label = self.MOTOR_LABELS[i] if i < len(self.MOTOR_LABELS) else f"M{i+1}"
-                    self.add_row(label, "ERROR", "—", "—")
+            # Rows are created once in on_mount; only cells whose text changed are updated.
+            # Bad motor data is already rejected when the columns are built, so the
+            # loop needs no per-row exception handling.
+            formats = self.TEMP_FORMATS
+            n = len(temps)
+            for i in range(12):
+                if i >= n:
+                    self._set_row(i, ("—", "—", "—"))
+                    continue
+                lost = losts[i]
+                self._set_row(i, (
+                    formats[bands[i]].format(temps[i]),
+                    f"{qs[i]:.4f}",
+                    f"[red]{lost:g}[/red]" if lost > 0 else f"{lost:g}",
+                ))
         except Exception as e:
             log_to_file(f"ERROR in update_motors: {e}")
-            import traceback
             log_to_file(traceback.format_exc())
 
 class SensorMonitorApp(App):
@@ -753,6 +1007,40 @@ class SensorMonitorApp(App):
     error_count = reactive(0)
     bandwidth_kbps = reactive(0.0)
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._widget_cache = {}  # id -> widget, so refreshes don't walk the DOM
+        self._label_text = {}  # id -> text last passed to update()
+        # Snapshots last pushed to the UI; writers swap in a new dict per message,
+        # so an identical reference means nothing arrived since the previous poll
+        self._shown_lowstate = None
+        self._shown_sportmodestate = None
+        # Newest sensor message time poll_database has already handled
+        self._last_polled_msg_time = None
+        # UI refresh failures since the last (throttled) report
+        self._poll_failures = 0
+        self._last_poll_failure_log = float('-inf')
+        # Sensor callback bookkeeping; set once here so the per-message path is a
+        # plain increment/compare (run_webrtc_connection resets it per connection)
+        self._last_message_time = {'lowstate': None, 'sportmode': None}
+        self._lowstate_msg_count = 0
+        self._sportmode_msg_count = 0
+        self._last_lowstate_log_time = 0.0
+        self._last_sportmode_log_time = 0.0
+    
+    def _widget(self, widget_id, widget_type=Label):
+        """query_one by id, cached after the first lookup."""
+        widget = self._widget_cache.get(widget_id)
+        if widget is None:
+            widget = self._widget_cache[widget_id] = self.query_one(f"#{widget_id}", widget_type)
+        return widget
+    
+    def _set_label(self, widget_id, text):
+        """Update a label only when its text changed; every update() re-renders it."""
+        if self._label_text.get(widget_id) != text:
+            self._widget(widget_id).update(text)
+            self._label_text[widget_id] = text
+    
     def compose(self) -> ComposeResult:
         """Create child widgets."""
         yield Header(show_clock=True)
@@ -808,8 +1096,7 @@ class SensorMonitorApp(App):
         # Clean up any existing database from previous run (unless in test mode)
         if not TEST_MODE:
             try:
-                if os.path.exists(db_path):
-                    os.remove(db_path)
+                remove_database_files()
             except Exception:
                 pass
         # Initialize database
@@ -828,66 +1115,63 @@ class SensorMonitorApp(App):
     
     def watch_connection_state(self, state: str) -> None:
         """Update connection state display."""
-        widget = self.query_one("#conn-status", Label)
         if state == "Connected":
-            widget.update(f"Connection: [bold green]{state}[/bold green]")
+            self._set_label("conn-status", f"Connection: [bold green]{state}[/bold green]")
         else:
-            widget.update(f"Connection: [bold red]{state}[/bold red]")
+            self._set_label("conn-status", f"Connection: [bold red]{state}[/bold red]")
     
     def watch_last_update(self, update_time: str) -> None:
         """Update last update time."""
-        self.query_one("#last-update", Label).update(f"Last Update: {update_time}")
+        self._set_label("last-update", f"Last Update: {update_time}")
     
     def watch_error_count(self, count: int) -> None:
         """Update error count."""
-        widget = self.query_one("#error-count", Label)
         if count > 0:
-            widget.update(f"Errors: [red]{count}[/red]")
+            self._set_label("error-count", f"Errors: [red]{count}[/red]")
         else:
-            widget.update(f"Errors: {count}")
+            self._set_label("error-count", f"Errors: {count}")
     
     def watch_bandwidth_kbps(self, kbps: float) -> None:
         """Update bandwidth display."""
-        widget = self.query_one("#bandwidth", Label)
         if kbps > 0:
             # Format with appropriate units
             if kbps >= 1000:
                 mbps = kbps / 1000.0
-                widget.update(f"Bandwidth: [green]{mbps:.2f} Mb/s[/green]")
+                self._set_label("bandwidth", f"Bandwidth: [green]{mbps:.2f} Mb/s[/green]")
             else:
-                widget.update(f"Bandwidth: [green]{kbps:.2f} kb/s[/green]")
+                self._set_label("bandwidth", f"Bandwidth: [green]{kbps:.2f} kb/s[/green]")
         else:
-            widget.update("Bandwidth: —")
+            self._set_label("bandwidth", "Bandwidth: —")
     
-    def update_motors(self, motor_state):
+    def update_motors(self, temps, qs, losts):
         """Update motor table."""
-        table = self.query_one("#motors", MotorTable)
-        table.update_motors(motor_state)
+        table = self._widget("motors", MotorTable)
+        table.update_motors(temps, qs, losts)
     
     def update_bms(self, bms):
         """Update BMS display."""
-        self.query_one("#bms-soc", Label).update(f"SOC: {bms.get('soc', '—')}%")
-        self.query_one("#bms-current", Label).update(f"Current: {bms.get('current', '—')} mA")
-        self.query_one("#bms-bq", Label).update(f"BQ NTC: {bms.get('bq_ntc', '—')}°C")
-        self.query_one("#bms-mcu", Label).update(f"MCU NTC: {bms.get('mcu_ntc', '—')}°C")
+        self._set_label("bms-soc", f"SOC: {bms.get('soc', '—')}%")
+        self._set_label("bms-current", f"Current: {bms.get('current', '—')} mA")
+        self._set_label("bms-bq", f"BQ NTC: {bms.get('bq_ntc', '—')}°C")
+        self._set_label("bms-mcu", f"MCU NTC: {bms.get('mcu_ntc', '—')}°C")
     
     def update_imu(self, imu):
         """Update IMU display."""
         rpy = imu.get('rpy', [0, 0, 0])
-        self.query_one("#imu-roll", Label).update(f"Roll: {rpy[0]:.4f}")
-        self.query_one("#imu-pitch", Label).update(f"Pitch: {rpy[1]:.4f}")
-        self.query_one("#imu-yaw", Label).update(f"Yaw: {rpy[2]:.4f}")
+        self._set_label("imu-roll", f"Roll: {rpy[0]:.4f}")
+        self._set_label("imu-pitch", f"Pitch: {rpy[1]:.4f}")
+        self._set_label("imu-yaw", f"Yaw: {rpy[2]:.4f}")
     
     def update_sport_mode(self, sms):
         """Update sport mode display."""
-        self.query_one("#sport-mode", Label).update(f"Mode: {sms.get('mode', '—')}")
-        self.query_one("#sport-height", Label).update(f"Body Height: {sms.get('body_height', '—'):.4f} m")
+        self._set_label("sport-mode", f"Mode: {sms.get('mode', '—')}")
+        self._set_label("sport-height", f"Body Height: {sms.get('body_height', '—'):.4f} m")
         pos = sms.get('position', '—')
         if pos != '—':
             pos_str = f"[{pos[0]:.3f}, {pos[1]:.3f}, {pos[2]:.3f}]"
         else:
             pos_str = "—"
-        self.query_one("#sport-pos", Label).update(f"Position: {pos_str}")
+        self._set_label("sport-pos", f"Position: {pos_str}")
     
     def update_connection_details_ui(self, details):
         """Update connection details display."""
@@ -895,21 +1179,21 @@ class SensorMonitorApp(App):
             # ICE state with color coding
             ice_state = details.get('ice_connection_state', 'unknown')
             ice_color = 'green' if ice_state == 'connected' else ('yellow' if ice_state == 'checking' else 'red')
-            self.query_one("#ice-state", Label).update(f"ICE State: [{ice_color}]{ice_state}[/{ice_color}]")
+            self._set_label("ice-state", f"ICE State: [{ice_color}]{ice_state}[/{ice_color}]")
             
             # Signaling state
             sig_state = details.get('signaling_state', 'unknown')
-            self.query_one("#signaling-state", Label).update(f"Signaling: {sig_state}")
+            self._set_label("signaling-state", f"Signaling: {sig_state}")
             
             # PC connection state with color coding
             pc_state = details.get('connection_state', 'unknown')
             pc_color = 'green' if pc_state == 'connected' else ('yellow' if pc_state == 'connecting' else 'red')
-            self.query_one("#pc-state", Label).update(f"PC State: [{pc_color}]{pc_state}[/{pc_color}]")
+            self._set_label("pc-state", f"PC State: [{pc_color}]{pc_state}[/{pc_color}]")
             
             # DataChannel state with color coding
             dc_state = details.get('datachannel_state', 'unknown')
             dc_color = 'green' if dc_state == 'open' else ('yellow' if dc_state == 'connecting' else 'red')
-            self.query_one("#dc-state", Label).update(f"DataChannel: [{dc_color}]{dc_state}[/{dc_color}]")
+            self._set_label("dc-state", f"DataChannel: [{dc_color}]{dc_state}[/{dc_color}]")
             
             # Uptime
             uptime = details.get('connection_uptime', 0.0)
@@ -917,7 +1201,7 @@ class SensorMonitorApp(App):
                 uptime_str = f"{int(uptime // 60)}m {int(uptime % 60)}s"
             else:
                 uptime_str = "—"
-            self.query_one("#uptime", Label).update(f"Uptime: {uptime_str}")
+            self._set_label("uptime", f"Uptime: {uptime_str}")
             
             # Last keepalive
             last_ka = details.get('last_keepalive')
@@ -932,15 +1216,15 @@ class SensorMonitorApp(App):
                 else:  # Very old
                     ka_str = f"{int(ka_age)}s ago"
                     ka_color = 'red'
-                self.query_one("#keepalive", Label).update(f"Last Keepalive: [{ka_color}]{ka_str}[/{ka_color}]")
+                self._set_label("keepalive", f"Last Keepalive: [{ka_color}]{ka_str}[/{ka_color}]")
             else:
-                self.query_one("#keepalive", Label).update("Last Keepalive: —")
+                self._set_label("keepalive", "Last Keepalive: —")
             
             # Message rates
             lowstate_rate = details.get('lowstate_msg_rate', 0.0)
             sportmode_rate = details.get('sportmode_msg_rate', 0.0)
-            self.query_one("#lowstate-rate", Label).update(f"LowState Rate: {lowstate_rate:.1f} msg/s")
-            self.query_one("#sportmode-rate", Label).update(f"SportMode Rate: {sportmode_rate:.1f} msg/s")
+            self._set_label("lowstate-rate", f"LowState Rate: {lowstate_rate:.1f} msg/s")
+            self._set_label("sportmode-rate", f"SportMode Rate: {sportmode_rate:.1f} msg/s")
         except Exception:
             pass  # Best-effort, don't crash on UI update
     
@@ -948,112 +1232,98 @@ class SensorMonitorApp(App):
         """Handle quit action."""
         self.exit()
     
+    @contextlib.contextmanager
+    def _poll_step(self, section):
+        """Run one best-effort UI refresh step; a failure skips just that step.
+
+        Failures are counted and logged at most once per POLL_FAILURE_LOG_INTERVAL.
+        """
+        try:
+            yield
+        except Exception as e:
+            self._poll_failures += 1
+            now = time.monotonic()
+            if now - self._last_poll_failure_log >= POLL_FAILURE_LOG_INTERVAL:
+                log_to_file(
+                    f"WARNING: UI refresh of {section} failed "
+                    f"({self._poll_failures} failure(s) since last report): {e}"
+                )
+                self._poll_failures = 0
+                self._last_poll_failure_log = now
+    
+    def _poll_sensor_panels(self) -> None:
+        """Redraw the motor/BMS/IMU/sport mode panels from the latest snapshots."""
+        lowstate = get_latest_lowstate()
+        if lowstate and lowstate is not self._shown_lowstate:
+            self._shown_lowstate = lowstate
+            motors = lowstate['motors']
+            if len(motors[0]):
+                with self._poll_step("motors"):
+                    self.update_motors(*motors)
+            if lowstate['bms_state']:
+                with self._poll_step("BMS"):
+                    self.update_bms(lowstate['bms_state'])
+            if lowstate['imu_state']:
+                with self._poll_step("IMU"):
+                    self.update_imu(lowstate['imu_state'])
+            with self._poll_step("last update"):
+                self.last_update = _fmt_hms(int(lowstate['timestamp']))
+        
+        sportmodestate = get_latest_sportmodestate()
+        if sportmodestate and sportmodestate is not self._shown_sportmodestate:
+            self._shown_sportmodestate = sportmodestate
+            with self._poll_step("sport mode"):
+                self.update_sport_mode(sportmodestate)
+            if not lowstate:
+                with self._poll_step("last update"):
+                    self.last_update = _fmt_hms(int(sportmodestate['timestamp']))
+    
     def poll_database(self) -> None:
         """Poll in-memory store for latest data and update UI (best-effort, non-blocking)."""
-        try:
-            # Get latest lowstate (best-effort, don't block)
-            try:
-                lowstate = get_latest_lowstate()
-                if lowstate:
-                    # Update motors (best-effort)
-                    try:
-                        motor_state = lowstate.get('motor_state', [])
-                        if motor_state:
-                            self.update_motors(motor_state)
-                    except Exception:
-                        pass  # Skip this update if it fails
-                    
-                    # Update BMS (best-effort)
-                    try:
-                        bms_state = lowstate.get('bms_state', {})
-                        if bms_state:
-                            self.update_bms(bms_state)
-                    except Exception:
-                        pass  # Skip this update if it fails
-                    
-                    # Update IMU (best-effort)
-                    try:
-                        imu_state = lowstate.get('imu_state', {})
-                        if imu_state:
-                            self.update_imu(imu_state)
-                    except Exception:
-                        pass  # Skip this update if it fails
-                    
-                    # Update timestamp (best-effort)
-                    try:
-                        if lowstate.get('timestamp'):
-                            self.last_update = time.strftime('%H:%M:%S', time.localtime(lowstate['timestamp']))
-                    except Exception:
-                        pass
-            except Exception:
-                pass  # Skip lowstate entirely if it fails
-            
-            # Get latest sport mode state (best-effort)
-            try:
-                sportmodestate = get_latest_sportmodestate()
-                if sportmodestate:
-                    try:
-                        self.update_sport_mode(sportmodestate)
-                    except Exception:
-                        pass  # Skip this update if it fails
-                    try:
-                        if sportmodestate.get('timestamp') and not lowstate:
-                            self.last_update = time.strftime('%H:%M:%S', time.localtime(sportmodestate['timestamp']))
-                    except Exception:
-                        pass
-            except Exception:
-                pass  # Skip sportmode entirely if it fails
-            
-            # Get error count (best-effort)
-            try:
-                error_count = get_error_count()
-                self.error_count = error_count
-            except Exception:
-                pass  # Skip if it fails
-            
-            # Get connection state (best-effort)
-            try:
-                conn_state = get_latest_connection_state()
-                if conn_state != self.connection_state:
-                    self.connection_state = conn_state
-            except Exception:
-                pass  # Skip if it fails
-            
-            # Get bandwidth (best-effort, display accurate value)
-            try:
-                kbps = get_bandwidth_kbps()
-                self.bandwidth_kbps = kbps
-            except Exception:
-                pass  # Skip if it fails
-            
-            # Get and display connection details (best-effort)
-            try:
-                details = get_connection_details()
-                self.update_connection_details_ui(details)
-            except Exception:
-                pass  # Skip if it fails
-        except Exception:
-            # If anything catastrophic happens, just skip this poll cycle
-            pass
+        # The callbacks stamp _last_message_time on every message; if it hasn't
+        # advanced since the last poll the sensor panels have nothing new to show
+        msg_times = self._last_message_time
+        last_msg_time = max(msg_times['lowstate'] or 0.0, msg_times['sportmode'] or 0.0)
+        if last_msg_time != self._last_polled_msg_time:
+            self._last_polled_msg_time = last_msg_time
+            with self._poll_step("sensor panels"):
+                self._poll_sensor_panels()
+        
+        with self._poll_step("error count"):
+            self.error_count = get_error_count()
+        
+        with self._poll_step("connection state"):
+            conn_state = get_latest_connection_state()
+            if conn_state != self.connection_state:
+                self.connection_state = conn_state
+        
+        with self._poll_step("bandwidth"):
+            self.bandwidth_kbps = get_bandwidth_kbps()
+        
+        with self._poll_step("connection details"):
+            self.update_connection_details_ui(get_connection_details())
     
     def action_refresh(self) -> None:
         """Handle refresh action."""
+        # Forget the shown snapshots so the sensor panels are redrawn
+        self._shown_lowstate = None
+        self._shown_sportmodestate = None
+        self._last_polled_msg_time = None
         self.poll_database()
     
     async def run_webrtc_connection(self):
         """Run the WebRTC connection."""
         global conn
         
-        # Suppress console output during connection
-        import sys
-        from io import StringIO
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        sys.stdout = StringIO()
-        sys.stderr = StringIO()
+        # Connection state reported once the retry loop ends
+        final_state = "Disconnected"
         
-        try:
-            connection_error_detected = {"value": False}
+        # Suppress console output during connection. Output goes to os.devnull:
+        # nothing reads it, and a StringIO would keep growing for the whole run.
+        # The redirects restore sys.stdout/sys.stderr however the block exits.
+        with open(os.devnull, 'w') as devnull, \
+                contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            connection_error_event = asyncio.Event()
             
             def exception_handler(loop, context):
                 exception = context.get('exception')
@@ -1061,63 +1331,80 @@ class SensorMonitorApp(App):
                     msg = str(exception)
                     if "'NoneType' object has no attribute 'media'" in msg:
                         log_to_file(f"WARNING: Intermittent connection error: {msg}")
-                        connection_error_detected["value"] = True
+                        connection_error_event.set()
                         return
                 loop.default_exception_handler(context)
             
             loop = asyncio.get_event_loop()
             loop.set_exception_handler(exception_handler)
             
-            # Infinite retry loop with exponential backoff (matching lidar2)
+            # Retry loop with exponential backoff and full jitter. retry_count is the
+            # lifetime attempt count; consecutive_failures resets on every successful
+            # connect and ends the loop once it exceeds MAX_CONSECUTIVE_FAILURES.
             retry_count = 0
-            consecutive_fast_failures = 0
+            consecutive_failures = 0
             
-            while True:  # Infinite retry loop
+            while True:
                 connection_start = time.time()
                 conn = Go2WebRTCConnection(WebRTCConnectionMethod.LocalAP)
                 try:
                     log_to_file(f"Connecting (attempt #{retry_count + 1})...")
-                    connection_error_detected["value"] = False
+                    connection_error_event.clear()
                     
                     async def connect_with_monitoring():
                         connect_task = asyncio.create_task(conn.connect())
-                        while not connect_task.done():
-                            if connection_error_detected["value"]:
+                        error_task = asyncio.create_task(connection_error_event.wait())
+                        try:
+                            # Wake on whichever finishes first instead of polling the flag
+                            await asyncio.wait({connect_task, error_task}, return_when=asyncio.FIRST_COMPLETED)
+                        finally:
+                            error_task.cancel()
+                            # Also reached when wait_for() times out and cancels us
+                            if not connect_task.done():
                                 connect_task.cancel()
-                                raise RuntimeError("Background task error detected")
-                            await asyncio.sleep(0.05)
-                        return await connect_task
+                        if connection_error_event.is_set():
+                            raise RuntimeError("Background task error detected")
+                        return connect_task.result()
                     
                     await asyncio.wait_for(connect_with_monitoring(), timeout=60.0)
                     
-                    if connection_error_detected["value"]:
+                    if connection_error_event.is_set():
                         raise RuntimeError("Background task error detected")
                     
                     pc = getattr(conn, "pc", None)
                     if not pc:
                         raise RuntimeError("Peer connection not created")
                     
-                    start_time = asyncio.get_event_loop().time()
-                    while True:
-                        if connection_error_detected["value"]:
-                            raise RuntimeError("Background task error detected")
-                        
-                        state = getattr(pc, "connectionState", None)
-                        if state == "connected":
-                            if pc.remoteDescription:
-                                break
-                            else:
-                                raise RuntimeError("Connected but no remote description")
-                        
-                        if state in {"failed", "disconnected", "closed"}:
-                            raise RuntimeError(f"Connection state is {state}")
-                        
-                        if asyncio.get_event_loop().time() - start_time > 2.0:
-                            raise RuntimeError("Connection state not progressing")
-                        
-                        await asyncio.sleep(0.05)
+                    # Wait for connected state, waking on each state change and bailing
+                    # immediately if the error event fires
+                    state_changed = asyncio.Event()
+                    pc.on("connectionstatechange", state_changed.set)
+                    deadline = asyncio.get_event_loop().time() + 2.0
+                    try:
+                        while True:
+                            if connection_error_event.is_set():
+                                raise RuntimeError("Background task error detected")
+                            
+                            state_changed.clear()
+                            state = pc.connectionState
+                            if state == "connected":
+                                if pc.remoteDescription:
+                                    break
+                                else:
+                                    raise RuntimeError("Connected but no remote description")
+                            
+                            if state in {"failed", "disconnected", "closed"}:
+                                raise RuntimeError(f"Connection state is {state}")
+                            
+                            remaining = deadline - asyncio.get_event_loop().time()
+                            if remaining <= 0 or not await _wait_any(state_changed, connection_error_event,
+                                                                     timeout=remaining):
+                                raise RuntimeError("Connection state not progressing")
+                    finally:
+                        pc.remove_listener("connectionstatechange", state_changed.set)
                     
                     log_to_file("Connection established successfully")
+                    consecutive_failures = 0
                     write_connection_state("Connected")
                     self.connection_state = "Connected"
                     
@@ -1141,7 +1428,6 @@ class SensorMonitorApp(App):
                             )
                     except Exception as e:
                         log_to_file(f"WARNING: Could not initialize connection details: {e}")
-                        import traceback
                         log_to_file(traceback.format_exc())
                     
                     # Disable traffic saving immediately (keepalive)
@@ -1185,8 +1471,7 @@ class SensorMonitorApp(App):
                     conn.datachannel.pub_sub.subscribe(RTC_TOPIC['LF_SPORT_MOD_STATE'], sportmodestate_message_handler)
                     
                     # Patch error handler to log to file and update UI (no console print)
-                    from go2_webrtc_driver.msgs import error_handler
-                    original_handle_error = error_handler.handle_error
+                    original_handle_error = _error_handler.handle_error
                     
                     def patched_handle_error(message):
                         self.error_callback(message)
@@ -1194,10 +1479,10 @@ class SensorMonitorApp(App):
                         data = message.get("data", [])
                         for error in data:
                             timestamp, error_source, error_code_int = error
-                            readable_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp))
+                            readable_time = _fmt_full(int(timestamp))
                             log_to_file(f"ERROR: Time={readable_time}, Source={error_source}, Code={error_code_int}")
                     
-                    error_handler.handle_error = patched_handle_error
+                    _error_handler.handle_error = patched_handle_error
                     
                     # Keepalive loop with connection monitoring (matching lidar2 approach)
                     connection_start_time = asyncio.get_event_loop().time()
@@ -1205,16 +1490,26 @@ class SensorMonitorApp(App):
                     last_keepalive = time.time()
                     msg_count_start_time = time.time()
                     
+                    # Each action owns a deadline on the loop clock; the loop sleeps until
+                    # the earliest one, or wakes immediately when a connection error fires.
+                    next_check_at = connection_start_time + CONNECTION_CHECK_INTERVAL
+                    next_keepalive_at = connection_start_time + KEEPALIVE_INTERVAL
+                    next_status_log_at = connection_start_time + STATUS_LOG_INTERVAL
+                    
                     try:
                         while True:
-                            if connection_error_detected["value"]:
-                                break
-                            
-                            await asyncio.sleep(1)  # Check more frequently for shutdown
+                            next_deadline = min(next_check_at, next_keepalive_at, next_status_log_at)
+                            timeout = max(0.0, next_deadline - asyncio.get_event_loop().time())
+                            try:
+                                await asyncio.wait_for(connection_error_event.wait(), timeout=timeout)
+                                break  # Error fired
+                            except asyncio.TimeoutError:
+                                pass
                             
                             current_time = time.time()
                             loop_time = asyncio.get_event_loop().time()
                             uptime = loop_time - connection_start_time
+                            next_check_at = loop_time + CONNECTION_CHECK_INTERVAL
                             
                             # Collect detailed connection state (with protection against hanging)
                             ice_conn_state = 'unknown'
@@ -1261,7 +1556,6 @@ class SensorMonitorApp(App):
                                     is_connected = False
                             except Exception as e:
                                 log_to_file(f"WARNING: Error checking connection status: {e}")
-                                import traceback
                                 log_to_file(traceback.format_exc())
                                 is_connected = False
                                 pc_state = 'error'
@@ -1326,28 +1620,32 @@ class SensorMonitorApp(App):
                                 )
                                 raise ConnectionError("WebRTC connection lost")
                             
-                            # Send active keepalive every 20 seconds (matching lidar2)
-                            if current_time - last_keepalive >= 20.0:
+                            # Send active keepalive every KEEPALIVE_INTERVAL seconds (matching lidar2)
+                            if loop_time >= next_keepalive_at:
+                                # Retry on the next health check unless the keepalive goes out
+                                next_keepalive_at = next_check_at
                                 try:
                                     dc_state_check = get_datachannel_state(conn)
                                     if dc_state_check == 'open':
                                         await conn.datachannel.disableTrafficSaving(True)
                                         last_keepalive = current_time
+                                        next_keepalive_at = loop_time + KEEPALIVE_INTERVAL
                                         update_connection_details(last_keepalive=last_keepalive)
                                         uptime = asyncio.get_event_loop().time() - connection_start_time
                                         log_to_file(f"Keepalive sent at {uptime:.0f}s")
                                     else:
                                         log_to_file(f"WARNING: Data channel not open (state: {dc_state_check}), cannot send keepalive")
-                                        # Don't update last_keepalive so we'll try again soon
+                                        # Don't reschedule a full interval so we'll try again soon
                                 except Exception as e:
                                     log_to_file(f"WARNING: Keepalive failed: {e}")
                                     # Don't break on keepalive failure - connection might still be alive
-                                    # Don't update last_keepalive so we'll try again soon
+                                    # Don't reschedule a full interval so we'll try again soon
                             
-                            # Log connection status every 30 seconds
-                            uptime = asyncio.get_event_loop().time() - connection_start_time
-                            if int(uptime) % 30 == 0 and uptime > 0:
+                            # Log connection status every STATUS_LOG_INTERVAL seconds
+                            if loop_time >= next_status_log_at:
+                                uptime = asyncio.get_event_loop().time() - connection_start_time
                                 log_to_file(f"Connection stable: {uptime:.0f}s")
+                                next_status_log_at += STATUS_LOG_INTERVAL
                     except ConnectionError as ce:
                         log_to_file("Connection error detected, exiting keepalive loop")
                         # Re-raise to trigger retry in outer loop
@@ -1365,23 +1663,22 @@ class SensorMonitorApp(App):
                     log_to_file("Keyboard interrupt - shutting down gracefully...")
                     break
                 except Exception as e:
-                    # Calculate connection duration and retry delay (matching lidar2)
+                    # Calculate connection duration and retry delay
                     connection_duration = time.time() - connection_start
                     retry_count += 1
+                    consecutive_failures += 1
+                    
+                    log_to_file(f"Connection failed after {connection_duration:.1f}s: {e}")
                     
-                    if connection_duration < 10:
-                        consecutive_fast_failures += 1
-                    else:
-                        consecutive_fast_failures = 0
+                    if consecutive_failures > MAX_CONSECUTIVE_FAILURES:
+                        log_to_file(f"Giving up after {consecutive_failures} consecutive failures")
+                        final_state = "Terminal"
+                        break
                     
-                    if consecutive_fast_failures > 3:
-                        reconnect_delay = min(30, 10 * consecutive_fast_failures)
-                        log_to_file(f"WARNING: {consecutive_fast_failures} fast failures detected")
-                    else:
-                        reconnect_delay = min(retry_count * 2, 30)
+                    backoff = min(RECONNECT_BACKOFF_CAP, RECONNECT_BACKOFF_BASE * (2 ** min(consecutive_failures, 5)))
+                    reconnect_delay = random.uniform(0, backoff)
                     
-                    log_to_file(f"Connection failed after {connection_duration:.1f}s: {e}")
-                    log_to_file(f"Reconnecting in {reconnect_delay}s... (attempt #{retry_count})")
+                    log_to_file(f"Reconnecting in {reconnect_delay:.1f}s... (attempt #{retry_count})")
                     
                     # Disconnect and cleanup
                     if conn:
@@ -1389,11 +1686,11 @@ class SensorMonitorApp(App):
                             await asyncio.wait_for(conn.disconnect(), timeout=5.0)
                         except Exception:
                             pass
-                    connection_error_detected["value"] = False
+                    connection_error_event.clear()
                     
-                    # Sleep with small increments to allow for shutdown checks
-                    for _ in range(int(reconnect_delay)):
-                        await asyncio.sleep(1.0)
+                    # One cancellable sleep; shutdown cancels this task, so no need to
+                    # wake every second to check for it
+                    await asyncio.sleep(reconnect_delay)
             
             # Final cleanup
             if conn:
@@ -1401,24 +1698,18 @@ class SensorMonitorApp(App):
                     await asyncio.wait_for(conn.disconnect(), timeout=5.0)
                 except Exception:
                     pass
-        finally:
-            # Restore console output
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
         
-        write_connection_state("Disconnected")
-        self.connection_state = "Disconnected"
+        write_connection_state(final_state)
+        self.connection_state = final_state
         log_to_file("WebRTC connection closed")
     
     def lowstate_callback(self, message):
         """Handle LOW_STATE messages - write to in-memory store."""
         try:
             # Update last message time for connection monitoring
-            if hasattr(self, '_last_message_time'):
-                self._last_message_time['lowstate'] = time.time()
+            self._last_message_time['lowstate'] = time.time()
             # Increment message counter for rate calculation
-            if hasattr(self, '_lowstate_msg_count'):
-                self._lowstate_msg_count += 1
+            self._lowstate_msg_count += 1
             
             data = message.get('data', {})
             write_lowstate(data)
@@ -1427,36 +1718,28 @@ class SensorMonitorApp(App):
             if ENABLE_VERBOSE_LOGGING:
                 # Log every message when verbose logging is enabled
                 motor_state = data.get('motor_state', [])
-                max_temp = max([m.get('temperature', 0) for m in motor_state]) if motor_state else 0
+                max_temp = max((m.get('temperature', 0) for m in motor_state), default=0)
                 log_to_file(f"LOW_STATE: Max motor temp: {max_temp}°C, Motors: {len(motor_state)}")
             else:
-                # Only log occasionally to reduce I/O overhead (every 100th message or every 10 seconds)
-                if not hasattr(self, '_lowstate_log_counter'):
-                    self._lowstate_log_counter = 0
-                    self._last_lowstate_log_time = time.time()
-                
-                self._lowstate_log_counter += 1
-                current_time = time.time()
+                # Only log occasionally to reduce I/O overhead (once per CALLBACK_LOG_INTERVAL)
+                current_time = time.monotonic()
                 
-                if self._lowstate_log_counter % 100 == 0 or (current_time - self._last_lowstate_log_time) >= 10.0:
+                if current_time - self._last_lowstate_log_time >= CALLBACK_LOG_INTERVAL:
                     motor_state = data.get('motor_state', [])
-                    max_temp = max([m.get('temperature', 0) for m in motor_state]) if motor_state else 0
+                    max_temp = max((m.get('temperature', 0) for m in motor_state), default=0)
                     log_to_file(f"LOW_STATE: Max motor temp: {max_temp}°C, Motors: {len(motor_state)}")
                     self._last_lowstate_log_time = current_time
         except Exception as e:
             log_to_file(f"ERROR in lowstate_callback: {e}")
-            import traceback
             log_to_file(traceback.format_exc())
     
     def sportmodestate_callback(self, message):
         """Handle LF_SPORT_MOD_STATE messages - write to in-memory store."""
         try:
             # Update last message time for connection monitoring
-            if hasattr(self, '_last_message_time'):
-                self._last_message_time['sportmode'] = time.time()
+            self._last_message_time['sportmode'] = time.time()
             # Increment message counter for rate calculation
-            if hasattr(self, '_sportmode_msg_count'):
-                self._sportmode_msg_count += 1
+            self._sportmode_msg_count += 1
             
             data = message.get('data', {})
             write_sportmodestate(data)
@@ -1466,30 +1749,27 @@ class SensorMonitorApp(App):
                 # Log every message when verbose logging is enabled
                 log_to_file(f"SPORT_MODE_STATE: Mode={data.get('mode', 'N/A')}, BodyHeight={data.get('body_height', 'N/A')}")
             else:
-                # Only log occasionally to reduce I/O overhead (every 50th message or every 10 seconds)
-                if not hasattr(self, '_sportmode_log_counter'):
-                    self._sportmode_log_counter = 0
-                    self._last_sportmode_log_time = time.time()
+                # Only log occasionally to reduce I/O overhead (once per CALLBACK_LOG_INTERVAL)
+                current_time = time.monotonic()
                 
-                self._sportmode_log_counter += 1
-                current_time = time.time()
-                
-                if self._sportmode_log_counter % 50 == 0 or (current_time - self._last_sportmode_log_time) >= 10.0:
+                if current_time - self._last_sportmode_log_time >= CALLBACK_LOG_INTERVAL:
                     log_to_file(f"SPORT_MODE_STATE: Mode={data.get('mode', 'N/A')}, BodyHeight={data.get('body_height', 'N/A')}")
                     self._last_sportmode_log_time = current_time
         except Exception as e:
             log_to_file(f"ERROR in sportmodestate_callback: {e}")
-            import traceback
             log_to_file(traceback.format_exc())
     
     def error_callback(self, message):
         """Handle error messages - write to database."""
         try:
             data = message.get("data", [])
-            for error in data:
-                timestamp, error_source, error_code_int = error
-                write_error(error_source, error_code_int, error)
-            log_to_file(f"ERROR MESSAGE: {json.dumps(message, indent=2)}")
+            # Each entry is [timestamp, error_source, error_code]; the whole entry
+            # is stored as error_data
+            write_errors_batch([(error[1], error[2], error) for error in data])
+            # patched_handle_error already logs one line per error; the raw
+            # message is only dumped (compact) when verbose logging is on
+            if ENABLE_VERBOSE_LOGGING:
+                log_to_file(f"ERROR MESSAGE: {json_dumps(message)}")
         except Exception as e:
             log_to_file(f"ERROR in error_callback: {e}")
     
@@ -1511,11 +1791,12 @@ class SensorMonitorApp(App):
             if not TEST_MODE:
                 try:
                     if os.path.exists(db_path):
-                        os.remove(db_path)
+                        remove_database_files()
                         log_to_file("Database cleaned up on exit")
                 except Exception as e:
                     log_to_file(f"ERROR cleaning up database: {e}")
             else:
+                close_database()
                 log_to_file(f"TEST MODE: Database preserved at {db_path}")
 
 def main():
@@ -1563,7 +1844,10 @@ def main():
     if ENABLE_VERBOSE_LOGGING:
         log_to_file("VERBOSE LOGGING ENABLED: All sensor messages will be logged")
     else:
-        log_to_file("Verbose logging disabled - using throttled logging (every 100th lowstate, every 50th sportmode)")
+        log_to_file(
+            f"Verbose logging disabled - using throttled logging "
+            f"(lowstate/sportmode at most once every {CALLBACK_LOG_INTERVAL:g}s)"
+        )
     
     app = SensorMonitorApp()
     try:
@@ -0,0 +1,24 @@
+"""Tests for sensor_monitor_backup's error handling path."""
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("textual")
+pytest.importorskip("aiortc")
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import sensor_monitor_backup as monitor  # noqa: E402
+
+
+def test_error_callback_records_each_error():
+    before = monitor.get_error_count()
+    message = {"type": "err", "data": [[1700000000, 100, 1], [1700000001, 200, 4]]}
+
+    monitor.SensorMonitorApp().error_callback(message)
+
+    assert monitor.get_error_count() == before + 2
+    latest = monitor.memory_store['errors'][-1]
+    assert (latest['error_source'], latest['error_code']) == (200, 4)
+    assert latest['error_data'] == [1700000001, 200, 4]
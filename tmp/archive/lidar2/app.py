@@ -19,20 +19,29 @@ Then open http://127.0.0.1:8080/ in your browser.
 """
 
 import builtins as _builtins
-import re as _re
 import sys
 import os
 import signal
 
 # Remove emojis from output for Windows terminal compatibility
 _builtin_print = _builtins.print
-emoji_pattern = _re.compile(r'[\U0001F300-\U0001FAD6\U0001FAE0-\U0001FAFF\U00002700-\U000027BF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\U0001F700-\U0001F77F\U0001F780-\U0001F7FF\U000025A0-\U000026FF]+', flags=_re.UNICODE)
+
+class _Cp1252Filter(dict):
+    """str.translate table deleting characters cp1252 can't encode; filled lazily per code point"""
+    def __missing__(self, c):
+        v = c if chr(c).encode('cp1252', errors='ignore') else None
+        self[c] = v
+        return v
+
+_cp1252_filter = _Cp1252Filter()
 
 def _no_emoji_print(*args, **kwargs):
     cleaned_args = []
     for a in args:
-        s = str(a)
-        s = s.encode('cp1252', errors='ignore').decode('cp1252')
+        s = a if type(a) is str else str(a)
+        # Pure-ASCII strings (nearly every print) are already cp1252-safe
+        if not s.isascii():
+            s = s.translate(_cp1252_filter)
         cleaned_args.append(s)
     return _builtin_print(*cleaned_args, **kwargs)
 
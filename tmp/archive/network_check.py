@@ -1,121 +1,243 @@
 #!/usr/bin/env python3
 """Network diagnostic script for robot connection"""
+import argparse
+import json
 import socket
 import subprocess
 import sys
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
 
-print("=" * 60)
-print("NETWORK DIAGNOSTICS")
-print("=" * 60)
-
-# 1. Check local IP addresses
-print("\n1. LOCAL IP ADDRESSES:")
 try:
     import netifaces
-    for interface in netifaces.interfaces():
-        addrs = netifaces.ifaddresses(interface)
-        if netifaces.AF_INET in addrs:
-            for addr in addrs[netifaces.AF_INET]:
-                ip = addr.get('addr', '')
-                if ip and not ip.startswith('127.'):
-                    print(f"  {interface}: {ip}")
+    HAVE_NIF = True
 except ImportError:
-    # Fallback to socket method
-    hostname = socket.gethostname()
-    print(f"  Hostname: {hostname}")
+    HAVE_NIF = False
+
+ROBOT_IP = "192.168.12.1"
+
+# Set by main(); silences log() in --json mode
+_json_mode = False
+
+
+def log(*a, **kw):
+    """print() that is silenced in --json mode"""
+    if not _json_mode:
+        print(*a, **kw)
+
+
+@contextmanager
+def timed_step(name, timings):
+    """Measure a diagnostic step, record it in timings and print its elapsed time"""
+    t0 = time.perf_counter_ns()
     try:
-        local_ip = socket.gethostbyname(hostname)
-        print(f"  Primary IP: {local_ip}")
-    except:
-        pass
+        yield
+    finally:
+        elapsed_ms = (time.perf_counter_ns() - t0) / 1e6
+        timings[name] = elapsed_ms
+        log(f"  [timing] {name} in {elapsed_ms:.2f} ms")
 
-# 2. Check robot reachability
-print("\n2. ROBOT REACHABILITY (192.168.12.1):")
-robot_ip = "192.168.12.1"
 
-# Ping test
-try:
-    result = subprocess.run(['ping', '-n', '2', robot_ip], 
-                          capture_output=True, text=True, timeout=5)
-    if 'TTL' in result.stdout or 'time=' in result.stdout:
-        print("  [OK] Ping successful")
-        # Extract latency
-        for line in result.stdout.split('\n'):
-            if 'time=' in line or 'time<' in line:
-                print(f"  {line.strip()}")
-    else:
-        print("  [FAIL] Ping failed - no response")
-        print(f"  Output: {result.stdout[:200]}")
-except Exception as e:
-    print(f"  [ERROR] Ping test failed: {e}")
-
-# 3. Check port 9991
-print("\n3. PORT 9991 ACCESS:")
-try:
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.settimeout(3)
-    result = s.connect_ex((robot_ip, 9991))
-    s.close()
-    if result == 0:
-        print("  [OK] Port 9991 is OPEN")
-    else:
-        print(f"  [FAIL] Port 9991 is CLOSED (error code: {result})")
-except Exception as e:
-    print(f"  [ERROR] Port test failed: {e}")
-
-# 4. Test HTTP connection
-print("\n4. HTTP CONNECTION TEST (port 9991):")
-try:
-    import urllib.request
-    url = f"http://{robot_ip}:9991/con_notify"
-    req = urllib.request.Request(url)
-    req.add_header('User-Agent', 'Python-diagnostic')
-    with urllib.request.urlopen(req, timeout=3) as response:
-        status = response.getcode()
-        data = response.read()[:100]
-        print(f"  [OK] HTTP {status} - Response received ({len(data)} bytes)")
-        print(f"  Response preview: {data[:50]}...")
-except urllib.error.URLError as e:
-    print(f"  [FAIL] HTTP connection failed: {e}")
-except Exception as e:
-    print(f"  [ERROR] HTTP test failed: {e}")
-
-# 5. Check for 192.168.12.x network
-print("\n5. NETWORK INTERFACE CHECK:")
-print("  Looking for 192.168.12.x address...")
-try:
-    import netifaces
-    found = False
+def snapshot_ifaces():
+    """Return {interface: [IPv4 addr dicts]} from a single netifaces pass"""
+    snap = {}
     for interface in netifaces.interfaces():
         addrs = netifaces.ifaddresses(interface)
         if netifaces.AF_INET in addrs:
-            for addr in addrs[netifaces.AF_INET]:
-                ip = addr.get('addr', '')
-                if ip and ip.startswith('192.168.12.'):
-                    print(f"  [OK] Found 192.168.12.x on {interface}: {ip}")
-                    found = True
-    if not found:
-        print("  [FAIL] No 192.168.12.x address found - NOT connected to robot network")
-except ImportError:
-    print("  [WARN] netifaces not available, using fallback method")
-    # Try socket method
+            snap[interface] = addrs[netifaces.AF_INET]
+    return snap
+
+
+def iter_ipv4(snap):
+    """Yield (interface, ip) for every non-empty IPv4 address in a snapshot"""
+    for interface, addrs in snap.items():
+        for addr in addrs:
+            ip = addr.get('addr')
+            if ip:
+                yield interface, ip
+
+
+def guess_local_ip(peer):
+    """Return the local IP the OS would route to peer (UDP connect, no traffic sent)"""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect((robot_ip, 80))
-        local_ip = s.getsockname()[0]
+        s.connect((peer, 80))
+        return s.getsockname()[0]
+    finally:
         s.close()
-        if local_ip.startswith('192.168.12.'):
-            print(f"  [OK] Found 192.168.12.x address: {local_ip}")
-        else:
-            print(f"  [WARN] Local IP is {local_ip} (not on 192.168.12.x network)")
+
+
+def probe_ping(host, count=2, timeout=5):
+    """Ping host; return {'ok', 'replies'} or {'ok': False, 'error'}"""
+    try:
+        result = subprocess.run(['ping', '-n', str(count), host],
+                                capture_output=True, text=True, timeout=timeout)
     except Exception as e:
-        print(f"  [ERROR] Could not determine local IP: {e}")
+        return {'ok': False, 'error': str(e)}
+    if 'TTL' in result.stdout or 'time=' in result.stdout:
+        replies = [line.strip() for line in result.stdout.split('\n')
+                   if 'time=' in line or 'time<' in line]
+        return {'ok': True, 'replies': replies}
+    return {'ok': False, 'output': result.stdout[:200]}
+
+
+def probe_port(host, port, timeout=3):
+    """TCP connect to host:port; return {'open', 'errno'} or {'open': False, 'error'}"""
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.settimeout(timeout)
+        try:
+            result = s.connect_ex((host, port))
+        finally:
+            s.close()
+    except Exception as e:
+        return {'open': False, 'error': str(e)}
+    return {'open': result == 0, 'errno': result}
+
+
+def probe_http(url, timeout=3):
+    """GET url; return {'ok', 'status', 'bytes', 'preview'} or {'ok': False, 'error'}"""
+    try:
+        req = urllib.request.Request(url)
+        req.add_header('User-Agent', 'Python-diagnostic')
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            data = response.read()[:100]
+            return {'ok': True, 'status': response.getcode(),
+                    'bytes': len(data), 'preview': data[:50]}
+    except urllib.error.URLError as e:
+        return {'ok': False, 'error': str(e), 'kind': 'url'}
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+
+
+def main():
+    global _json_mode
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--json', action='store_true',
+                        help="emit a single JSON object instead of human-readable text")
+    args = parser.parse_args()
+    _json_mode = args.json
 
-print("\n" + "=" * 60)
-print("DIAGNOSTICS COMPLETE")
-print("=" * 60)
+    robot_ip = ROBOT_IP
+    # Per-step wall time in ms, filled by timed_step()
+    timings = {}
+    # Per-step outcome, dumped as-is in --json mode
+    results = {}
+
+    # Interface enumeration (or, without netifaces, the routed local IP) is
+    # looked up once and shared by steps 1 and 5
+    iface_snapshot = snapshot_ifaces() if HAVE_NIF else None
+    fallback_ip = fallback_error = None
+    if not HAVE_NIF:
+        try:
+            fallback_ip = guess_local_ip(robot_ip)
+        except OSError as e:
+            fallback_error = e
+
+    log("=" * 60)
+    log("NETWORK DIAGNOSTICS")
+    log("=" * 60)
+
+    # 1. Check local IP addresses
+    log("\n1. LOCAL IP ADDRESSES:")
+    with timed_step("local_ips", timings):
+        if HAVE_NIF:
+            local_ips = {}
+            for interface, ip in iter_ipv4(iface_snapshot):
+                if not ip.startswith('127.'):
+                    local_ips.setdefault(interface, []).append(ip)
+                    log(f"  {interface}: {ip}")
+            results['local_ips'] = local_ips
+        else:
+            # Fallback to socket method
+            hostname = socket.gethostname()
+            results['local_ips'] = {'hostname': hostname}
+            log(f"  Hostname: {hostname}")
+            if fallback_ip:
+                results['local_ips']['primary_ip'] = fallback_ip
+                log(f"  Primary IP: {fallback_ip}")
+
+    # 2. Check robot reachability
+    log(f"\n2. ROBOT REACHABILITY ({robot_ip}):")
+    with timed_step("ping", timings):
+        ping = results['ping'] = probe_ping(robot_ip)
+        if ping['ok']:
+            log("  [OK] Ping successful")
+            for line in ping['replies']:
+                log(f"  {line}")
+        elif 'error' in ping:
+            log(f"  [ERROR] Ping test failed: {ping['error']}")
+        else:
+            log("  [FAIL] Ping failed - no response")
+            log(f"  Output: {ping['output']}")
+
+    # 3. Check port 9991
+    log("\n3. PORT 9991 ACCESS:")
+    with timed_step("port_9991", timings):
+        port = results['port_9991'] = probe_port(robot_ip, 9991)
+        if port['open']:
+            log("  [OK] Port 9991 is OPEN")
+        elif 'error' in port:
+            log(f"  [ERROR] Port test failed: {port['error']}")
+        else:
+            log(f"  [FAIL] Port 9991 is CLOSED (error code: {port['errno']})")
+
+    # 4. Test HTTP connection
+    log("\n4. HTTP CONNECTION TEST (port 9991):")
+    with timed_step("http", timings):
+        http = probe_http(f"http://{robot_ip}:9991/con_notify")
+        if http['ok']:
+            log(f"  [OK] HTTP {http['status']} - Response received ({http['bytes']} bytes)")
+            log(f"  Response preview: {http.pop('preview')}...")
+        elif http.pop('kind', None) == 'url':
+            log(f"  [FAIL] HTTP connection failed: {http['error']}")
+        else:
+            log(f"  [ERROR] HTTP test failed: {http['error']}")
+        results['http'] = http
+
+    # 5. Check for 192.168.12.x network
+    log("\n5. NETWORK INTERFACE CHECK:")
+    with timed_step("iface_check", timings):
+        log("  Looking for 192.168.12.x address...")
+        if HAVE_NIF:
+            matches = [(interface, ip) for interface, ip in iter_ipv4(iface_snapshot)
+                       if ip.startswith('192.168.12.')]
+            results['robot_network'] = {'ok': bool(matches),
+                                        'addresses': [ip for _, ip in matches]}
+            for interface, ip in matches:
+                log(f"  [OK] Found 192.168.12.x on {interface}: {ip}")
+            if not matches:
+                log("  [FAIL] No 192.168.12.x address found - NOT connected to robot network")
+        else:
+            log("  [WARN] netifaces not available, using fallback method")
+            if fallback_error is not None:
+                log(f"  [ERROR] Could not determine local IP: {fallback_error}")
+                results['robot_network'] = {'ok': False, 'error': str(fallback_error)}
+            else:
+                results['robot_network'] = {'ok': fallback_ip.startswith('192.168.12.'),
+                                            'addresses': [fallback_ip]}
+                if fallback_ip.startswith('192.168.12.'):
+                    log(f"  [OK] Found 192.168.12.x address: {fallback_ip}")
+                else:
+                    log(f"  [WARN] Local IP is {fallback_ip} (not on 192.168.12.x network)")
 
+    if args.json:
+        results['timings_ms'] = timings
+        json.dump(results, sys.stdout, separators=(',', ':'))
+        sys.stdout.write('\n')
+        return
 
+    if timings:
+        hot_step = max(timings, key=timings.get)
+        log(f"\n[timing] hot step: {hot_step} ({timings[hot_step]:.2f} ms)")
 
+    log("\n" + "=" * 60)
+    log("DIAGNOSTICS COMPLETE")
+    log("=" * 60)
 
 
+if __name__ == "__main__":
+    main()
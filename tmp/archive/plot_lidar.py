@@ -11,9 +11,11 @@ Usage:
 Options:
     --cam-center          Put camera at the center
     --type-voxel          Use voxel view instead of point cloud
-    --csv-read FILE       Read from CSV file instead of WebRTC
-    --csv-write           Write lidar data to CSV file
+    --csv-read FILE       Replay a (legacy) CSV recording instead of WebRTC
+    --bin-read FILE       Replay a binary recording instead of WebRTC
+    --record              Record lidar frames to a binary .bin file (alias: --csv-write)
     --skip-mod N          Skip N-1 messages (default: 1, no skipping)
+    --voxel-size S        Emit one point per S-sized voxel (default: 0, disabled)
     --minYValue N         Minimum Y value filter (default: 0)
     --maxYValue N         Maximum Y value filter (default: 100)
 
@@ -24,21 +26,41 @@ Prerequisites:
 """
 
 import builtins as _builtins
-import re as _re
+import itertools as _itertools
 
 # Remove emojis from output for Windows terminal compatibility
 _builtin_print = _builtins.print
-emoji_pattern = _re.compile('[\U0001F300-\U0001FAD6\U0001FAE0-\U0001FAFF\U00002700-\U000027BF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\U0001F700-\U0001F77F\U0001F780-\U0001F7FF]+', flags=_re.UNICODE)
+# str.translate deletion table: one C-level pass per string, no regex engine
+_EMOJI_TABLE = dict.fromkeys(_itertools.chain(
+    range(0x1F300, 0x1FAD7),
+    range(0x1FAE0, 0x1FB00),
+    range(0x2700, 0x27C0),
+))
 
 
 def _no_emoji_print(*args, **kwargs):
-    args = tuple(emoji_pattern.sub('', str(a)) for a in args)
+    args = tuple(str(a).translate(_EMOJI_TABLE) for a in args)
     return _builtin_print(*args, **kwargs)
 
 
 _builtins.print = _no_emoji_print
 
+import os
+import re
+import sys
+
+# The per-frame point rotation is a small N x 3 @ 3 x 3 sgemm; on Windows the
+# MKL/OpenBLAS thread pool costs more than the kernel itself at ~10k points.
+if sys.platform == "win32":
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+
 import asyncio
+import atexit
+import collections
+import mmap
+import queue
+import struct
+import threading
 import logging
 import csv
 import numpy as np
@@ -47,11 +69,15 @@ from flask_socketio import SocketIO
 from go2_webrtc_driver.webrtc_driver import Go2WebRTCConnection, WebRTCConnectionMethod
 import argparse
 from datetime import datetime
-import os
-import sys
-import ast
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
 
 from aiortc import RTCPeerConnection, RTCSessionDescription
 import go2_webrtc_driver.util as _util
@@ -72,24 +98,43 @@ socketio = SocketIO(app, async_mode='threading', cors_allowed_origins="*")
 
 logging.basicConfig(level=logging.FATAL)
 
+# Per-frame logging goes through this logger so disabled levels cost nothing
+logger = logging.getLogger("lidar")
+logger.setLevel(logging.INFO)
+LOG_EVERY_N_FRAMES = 64  # Emit one INFO progress line per this many frames
+
 # Constants to enable/disable features
 ENABLE_POINT_CLOUD = True
 SAVE_LIDAR_DATA = True
 
 # File paths
 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-LIDAR_CSV_FILE = f"lidar_data_{timestamp}.csv"
+LIDAR_RECORD_FILE = f"lidar_data_{timestamp}.bin"
+
+# Binary recording: a sequence of frames, each a fixed header followed by
+# point_count * 3 little-endian float32 values (x, y, z interleaved).
+# Header fields: stamp, frame_id, resolution, src_size, origin[3], width[3], point_count
+FRAME_HEADER = struct.Struct("<d16sfI3f3fI")
 
 # Global variables
-lidar_csv_file = None
-lidar_csv_writer = None
+lidar_record_file = None
+lidar_record_queue = None   # Frames waiting for the recording writer thread
+lidar_record_thread = None
+RECORD_FLUSH_INTERVAL = 2.0  # Seconds between flushes of the recording file
 
 lidar_buffer = []
 message_count = 0  # Counter for processed LIDAR messages
+
+# LiDAR frames are processed on one worker thread so NumPy work never blocks the
+# asyncio loop that drains the data channel. Only the newest unprocessed frame is
+# kept; stale ones are dropped.
+_lidar_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lidar")
+_pending_lidar = collections.deque(maxlen=1)
 reconnect_interval = 5  # Time (seconds) before retrying connection
 
 # Constants
 MAX_RETRY_ATTEMPTS = 10
+MAX_POINTS = 200000  # Upper bound for preallocated per-frame point buffers
 
 ROTATE_X_ANGLE = np.pi / 2  # 90 degrees
 ROTATE_Z_ANGLE = np.pi      # 180 degrees
@@ -101,16 +146,19 @@ maxYValue = 100
 parser = argparse.ArgumentParser(description="LIDAR Viz for Go2")
 parser.add_argument("--cam-center", action="store_true", help="Put Camera at the Center")
 parser.add_argument("--type-voxel", action="store_true", help="Voxel View")
-parser.add_argument("--csv-read", type=str, help="Read from CSV files instead of WebRTC")
-parser.add_argument("--csv-write", action="store_true", help="Write CSV data file")
+parser.add_argument("--csv-read", type=str, help="Replay a (legacy) CSV recording instead of WebRTC")
+parser.add_argument("--bin-read", type=str, help="Replay a binary recording instead of WebRTC")
+parser.add_argument("--record", "--csv-write", dest="record", action="store_true", help="Record frames to a binary .bin file")
 parser.add_argument("--skip-mod", type=int, default=1, help="Skip messages using modulus (default: 1, no skipping)")
+parser.add_argument("--voxel-size", type=float, default=0.0,
+                    help="Keep one point per voxel of this edge length (decoder grid units) before emitting; 0 disables")
 parser.add_argument('--minYValue', type=int, default=0, help='Minimum Y value for the plot')
 parser.add_argument('--maxYValue', type=int, default=100, help='Maximum Y value for the plot')
 args = parser.parse_args()
 
 minYValue = args.minYValue
 maxYValue = args.maxYValue
-SAVE_LIDAR_DATA = args.csv_write
+SAVE_LIDAR_DATA = args.record
 
 # Apply patches from min_connect_status.py
 def _patched_print_status(status_type, status_message):
@@ -120,24 +168,27 @@ def _patched_print_status(status_type, status_message):
 
 _util.print_status = _patched_print_status
 
-_orig_wait_datachannel_open = _webrtc_datachannel.WebRTCDataChannel.wait_datachannel_open
+_orig_datachannel_init = _webrtc_datachannel.WebRTCDataChannel.__init__
+
+
+def _patched_datachannel_init(self, conn, pc):
+    """Attach an event that the channel's 'open' handler sets."""
+    _orig_datachannel_init(self, conn, pc)
+    self._open_event = asyncio.Event()
+    self.channel.on("open", self._open_event.set)
+
+
+_webrtc_datachannel.WebRTCDataChannel.__init__ = _patched_datachannel_init
 
 
 async def _patched_wait_datachannel_open(self, timeout=5):
-    """Extended wait for data channel with better logging."""
-    deadline = time.time() + 30.0
-    last_log = 0
-    while time.time() < deadline:
-        if getattr(self, "data_channel_opened", False):
-            return
-        channel = getattr(self, "channel", None)
-        state = getattr(channel, "readyState", None)
-        if state == "open":
-            return
-        if time.time() - last_log >= 2.0:
-            last_log = time.time()
-        await asyncio.sleep(0.1)
-    _builtin_print("Warning: data channel did not report open within 30s; continuing anyway")
+    """Extended (30s) wait for the data channel, woken by its 'open' event."""
+    if getattr(self, "data_channel_opened", False) or self.channel.readyState == "open":
+        return
+    try:
+        await asyncio.wait_for(self._open_event.wait(), timeout=30.0)
+    except asyncio.TimeoutError:
+        _builtin_print("Warning: data channel did not report open within 30s; continuing anyway")
 
 
 _webrtc_datachannel.WebRTCDataChannel.wait_datachannel_open = _patched_wait_datachannel_open
@@ -145,38 +196,31 @@ _webrtc_datachannel.WebRTCDataChannel.wait_datachannel_open = _patched_wait_data
 _orig_send_local = _unitree_auth.send_sdp_to_local_peer
 
 
+_M_APPLICATION_RE = re.compile(r"^m=application[^\r\n]*", re.M)
+_SCTP_PORT_RE = re.compile(r"^a=sctp-port[^\r\n]*", re.M)
+_STRONG_FINGERPRINT_RE = re.compile(r"^a=fingerprint:sha-(?:384|512)[^\r\n]*(?:\r?\n)?", re.M)
+_LEGACY_SCTPMAP = "a=sctpmap:5000 webrtc-datachannel 65535"
+
+
 def _rewrite_sdp_to_legacy(sdp: str) -> str:
     """Rewrite SDP from RFC 8841 format to legacy format for aiortc compatibility."""
     if not isinstance(sdp, str):
         return sdp
-    lines = []
-    saw_m_application = False
-    saw_sctpmap = False
-    for line in sdp.splitlines():
-        if line.startswith("m=application"):
-            lines.append("m=application 9 DTLS/SCTP 5000")
-            saw_m_application = True
-        elif line.startswith("a=sctp-port"):
-            lines.append("a=sctpmap:5000 webrtc-datachannel 65535")
-            saw_sctpmap = True
-        else:
-            lines.append(line)
+    sdp, saw_m_application = _M_APPLICATION_RE.subn("m=application 9 DTLS/SCTP 5000", sdp)
+    sdp, saw_sctpmap = _SCTP_PORT_RE.subn(_LEGACY_SCTPMAP, sdp)
+    if not sdp.endswith("\n"):
+        sdp += "\r\n"
     if saw_m_application and not saw_sctpmap:
-        lines.append("a=sctpmap:5000 webrtc-datachannel 65535")
-    return "\r\n".join(lines) + "\r\n"
+        sdp += _LEGACY_SCTPMAP + "\r\n"
+    return sdp
 
 
 def _patched_send_sdp(ip, sdp):
     """Patch SDP exchange to strip problematic fingerprints and rewrite to legacy format."""
     try:
         payload = json.loads(sdp)
-        offer_sdp = payload.get("sdp", "")
-        filtered = [
-            line for line in offer_sdp.splitlines()
-            if not line.startswith("a=fingerprint:sha-384")
-            and not line.startswith("a=fingerprint:sha-512")
-        ]
-        payload["sdp"] = _rewrite_sdp_to_legacy("\r\n".join(filtered) + "\r\n")
+        offer_sdp = _STRONG_FINGERPRINT_RE.sub("", payload.get("sdp", ""))
+        payload["sdp"] = _rewrite_sdp_to_legacy(offer_sdp)
         sdp = json.dumps(payload)
     except Exception:
         pass
@@ -242,31 +286,88 @@ def handle_check_args():
     typeFlagBinary = format(typeFlag, "04b")
     socketio.emit("check_args_ack", {"type": typeFlagBinary})
 
-def setup_csv_output():
-    """Set up CSV files for LIDAR output."""
-    global lidar_csv_file, lidar_csv_writer
+def pack_frame(data, points):
+    """Serialize one LIDAR frame (message["data"] metadata + (N, 3) points) for recording."""
+    points = np.ascontiguousarray(points, dtype=np.float32)
+    header = FRAME_HEADER.pack(
+        float(data["stamp"]),
+        str(data["frame_id"]).encode("utf-8")[:16],
+        float(data["resolution"]),
+        int(data["src_size"]),
+        *data["origin"],
+        *data["width"],
+        len(points)
+    )
+    return header + points.tobytes()
+
+def iter_frames(buf):
+    """Yield (header_fields, points) for each complete frame in a recording buffer.
+
+    ``points`` is a zero-copy (N, 3) float32 view into ``buf``.
+    """
+    offset = 0
+    size = len(buf)
+    while offset + FRAME_HEADER.size <= size:
+        fields = FRAME_HEADER.unpack_from(buf, offset)
+        point_count = fields[-1]
+        offset += FRAME_HEADER.size
+        if offset + point_count * 12 > size:
+            break  # Truncated final frame (recording was interrupted)
+        points = np.frombuffer(buf, dtype=np.float32, count=point_count * 3, offset=offset).reshape(-1, 3)
+        offset += point_count * 12
+        yield fields, points
+
+def _record_writer_worker(record_file, frames_queue):
+    """Drain queued LIDAR frames into the recording in batches until a None sentinel arrives."""
+    last_flush = time.monotonic()
+    done = False
+    while not done:
+        items = [frames_queue.get()]
+        while True:
+            try:
+                items.append(frames_queue.get_nowait())
+            except queue.Empty:
+                break
+        if items[-1] is None:
+            items.pop()
+            done = True
+        # Frames are packed here rather than on the LiDAR worker thread
+        record_file.write(b"".join(pack_frame(data, points) for data, points in items))
+        now = time.monotonic()
+        if done or now - last_flush >= RECORD_FLUSH_INTERVAL:
+            record_file.flush()
+            last_flush = now
+
+def setup_record_output():
+    """Set up the binary file for LIDAR recording."""
+    global lidar_record_file, lidar_record_queue, lidar_record_thread
 
     if SAVE_LIDAR_DATA:
-        lidar_csv_file = open(LIDAR_CSV_FILE, mode='w', newline='', encoding='utf-8')
-        lidar_csv_writer = csv.writer(lidar_csv_file)
-        lidar_csv_writer.writerow(['stamp', 'frame_id', 'resolution', 'src_size', 'origin', 'width', 
-                                   'point_count', 'positions'])
-        lidar_csv_file.flush()
-
-def close_csv_output():
-    """Close CSV files."""
-    global lidar_csv_file
-
-    if lidar_csv_file:
-        lidar_csv_file.close()
-        lidar_csv_file = None
-
-def filter_points(points, percentage):
-    """Filter points to skip plotting points within a certain percentage of distance to each other."""
-    return points  # No filtering
-
-def rotate_points(points, x_angle, z_angle):
-    """Rotate points around the x and z axes by given angles."""
+        lidar_record_file = open(LIDAR_RECORD_FILE, mode='wb')
+        lidar_record_queue = queue.Queue()
+        lidar_record_thread = threading.Thread(target=_record_writer_worker,
+                                               args=(lidar_record_file, lidar_record_queue),
+                                               name="lidar-record", daemon=True)
+        lidar_record_thread.start()
+
+def close_record_output():
+    """Close the LIDAR recording file."""
+    global lidar_record_file, lidar_record_queue, lidar_record_thread
+
+    if lidar_record_thread:
+        lidar_record_queue.put(None)
+        lidar_record_thread.join()
+        lidar_record_thread = None
+        lidar_record_queue = None
+    if lidar_record_file:
+        lidar_record_file.close()
+        lidar_record_file = None
+
+# Rows still queued at shutdown would otherwise be lost with the daemon writer thread
+atexit.register(close_record_output)
+
+def rotation_matrix(x_angle, z_angle):
+    """Build the combined matrix for a rotation around x followed by z."""
     rotation_matrix_x = np.array([
         [1, 0, 0],
         [0, np.cos(x_angle), -np.sin(x_angle)],
@@ -279,9 +380,146 @@ def rotate_points(points, x_angle, z_angle):
         [0, 0, 1]
     ])
     
-    points = points @ rotation_matrix_x.T
-    points = points @ rotation_matrix_z.T
-    return points
+    return rotation_matrix_z @ rotation_matrix_x
+
+# The angles are fixed, so build the (transposed) rotation once instead of per frame
+_ROT_T = np.ascontiguousarray(rotation_matrix(ROTATE_X_ANGLE, ROTATE_Z_ANGLE).T, dtype=np.float32)
+
+def rotate_points(points, out=None):
+    """Rotate points around the x and z axes by ROTATE_X_ANGLE and ROTATE_Z_ANGLE.
+
+    Points are made float32 C-contiguous so the multiply lands in a single BLAS
+    sgemm call; pass a preallocated (N, 3) float32 ``out`` to avoid a new array.
+    """
+    points = np.ascontiguousarray(points, dtype=np.float32)
+    return np.dot(points, _ROT_T, out=out)
+
+def unique_points_of(points):
+    """Drop duplicate rows from an (N, 3) array.
+
+    Each row is viewed as one opaque void scalar so np.unique sorts N
+    fixed-size keys instead of doing a lexicographic axis=0 sort.
+    """
+    points = np.ascontiguousarray(points)
+    rows = points.view(np.dtype((np.void, points.dtype.itemsize * points.shape[1])))
+    _, idx = np.unique(rows.ravel(), return_index=True)
+    return points[idx]
+
+class PointBuffers:
+    """Scratch arrays reused across LiDAR frames, grown only when a frame exceeds them."""
+
+    def __init__(self, capacity=MAX_POINTS):
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.rotated = np.empty((capacity, 3), dtype=np.float32)
+        self.mask = np.empty(capacity, dtype=bool)
+        self.mask_tmp = np.empty(capacity, dtype=bool)
+        self.xyz = np.empty((capacity, 3), dtype=np.float32)
+        self.scalar = np.empty(capacity, dtype=np.float32)
+
+    def reserve(self, n):
+        if n > self.capacity:
+            self._allocate(n)
+
+def _transform_points_numpy(points, y_min, y_max, bufs):
+    """NumPy fallback for transform_points(); every step writes into bufs."""
+    total = len(points)
+    rotated = rotate_points(points, out=bufs.rotated[:total])
+    y = rotated[:, 1]
+    mask = np.greater_equal(y, y_min, out=bufs.mask[:total])
+    np.logical_and(mask, np.less_equal(y, y_max, out=bufs.mask_tmp[:total]), out=mask)
+    n = int(np.count_nonzero(mask))
+    if n == 0:
+        return 0, 0.0, 0.0, 0.0
+    kept = np.compress(mask, rotated, axis=0, out=bufs.xyz[:n])
+    cx, cy, cz = (float(c) for c in kept.mean(axis=0))
+    np.subtract(kept, np.array([cx, cy, cz], dtype=np.float32), out=kept)
+    # Fused square-and-sum per row, then sqrt in place: no N x 3 temporary
+    scalars = np.einsum('ij,ij->i', kept, kept, out=bufs.scalar[:n])
+    np.sqrt(scalars, out=scalars)
+    return n, cx, cy, cz
+
+if HAVE_NUMBA:
+    @njit(fastmath=True, cache=True)
+    def _transform_points_jit(points, rot_t, y_min, y_max, out_xyz, out_scalar):
+        """Fused rotate + Y-filter + center + norm; reads each input point once."""
+        n = 0
+        sx = sy = sz = 0.0
+        for i in range(points.shape[0]):
+            x = points[i, 0]
+            y = points[i, 1]
+            z = points[i, 2]
+            ry = x * rot_t[0, 1] + y * rot_t[1, 1] + z * rot_t[2, 1]
+            if ry < y_min or ry > y_max:
+                continue
+            rx = x * rot_t[0, 0] + y * rot_t[1, 0] + z * rot_t[2, 0]
+            rz = x * rot_t[0, 2] + y * rot_t[1, 2] + z * rot_t[2, 2]
+            out_xyz[n, 0] = rx
+            out_xyz[n, 1] = ry
+            out_xyz[n, 2] = rz
+            sx += rx
+            sy += ry
+            sz += rz
+            n += 1
+        if n == 0:
+            return 0, 0.0, 0.0, 0.0
+        cx = sx / n
+        cy = sy / n
+        cz = sz / n
+        for i in range(n):
+            dx = out_xyz[i, 0] - cx
+            dy = out_xyz[i, 1] - cy
+            dz = out_xyz[i, 2] - cz
+            out_xyz[i, 0] = dx
+            out_xyz[i, 1] = dy
+            out_xyz[i, 2] = dz
+            out_scalar[i] = np.sqrt(dx * dx + dy * dy + dz * dz)
+        return n, cx, cy, cz
+
+def transform_points(points, bufs):
+    """Rotate, Y-filter and center points, and compute their distance to the center.
+
+    Returns ``(n, (cx, cy, cz))``: ``bufs.xyz[:n]`` holds the centered points and
+    ``bufs.scalar[:n]`` their norms. Uses a fused Numba kernel when numba is
+    installed, NumPy otherwise.
+    """
+    points = np.ascontiguousarray(points, dtype=np.float32)
+    bufs.reserve(len(points))
+    y_min, y_max = float(minYValue), float(maxYValue)
+    if HAVE_NUMBA:
+        n, cx, cy, cz = _transform_points_jit(points, _ROT_T, y_min, y_max, bufs.xyz, bufs.scalar)
+    else:
+        n, cx, cy, cz = _transform_points_numpy(points, y_min, y_max, bufs)
+    return n, (float(cx), float(cy), float(cz))
+
+def voxel_downsample_indices(points, voxel_size):
+    """Return indices selecting one representative point per voxel_size cube.
+
+    Voxel coordinates are packed 21 bits per axis into one int64 key, so the
+    dedup is a 1-D integer unique rather than a sort over float rows.
+    """
+    keys = np.floor_divide(points, voxel_size).astype(np.int64)
+    keys -= keys.min(axis=0)
+    packed = keys[:, 0] | (keys[:, 1] << 21) | (keys[:, 2] << 42)
+    _, idx = np.unique(packed, return_index=True)
+    return idx
+
+def emit_lidar_frame(points, scalars, center):
+    """Send one processed frame to the browser as binary float32 buffers."""
+    if args.voxel_size > 0 and len(points):
+        idx = voxel_downsample_indices(points, args.voxel_size)
+        points = points[idx]
+        scalars = scalars[idx]
+    socketio.emit("lidar_data", {
+        "points": points.astype(np.float32, copy=False).tobytes(),
+        "scalars": scalars.astype(np.float32, copy=False).tobytes(),
+        "count": len(points),
+        "max_scalar": float(scalars.max()) if len(scalars) else 0.0,
+        "center": {"x": center[0], "y": center[1], "z": center[2]}
+    })
+    return len(points)
 
 async def lidar_webrtc_connection():
     """Connect to WebRTC and process LIDAR data."""
@@ -309,11 +547,14 @@ async def lidar_webrtc_connection():
             conn.datachannel.pub_sub.publish_without_callback("rt/utlidar/switch", "on")
             _builtin_print("LiDAR sensor enabled")
 
-            # Set up CSV outputs
-            setup_csv_output()
+            # Set up recording output
+            setup_record_output()
+
+            # Reused across frames for the transform scratch and output
+            point_bufs = PointBuffers()
 
-            async def lidar_callback_task(message):
-                """Task to process incoming LIDAR data."""
+            def lidar_callback_task(message):
+                """Process one LIDAR message (runs on the LiDAR worker thread)."""
                 if not ENABLE_POINT_CLOUD:
                     return
 
@@ -334,54 +575,33 @@ async def lidar_webrtc_connection():
 
                     positions = message["data"]["data"].get("positions", [])
                     origin = message["data"].get("origin", [])
-                    points = np.array([positions[i:i+3] for i in range(0, len(positions), 3)], dtype=np.float32)
+                    points = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
                     total_points = len(points)
-                    unique_points = np.unique(points, axis=0)
-
-                    # Save to CSV
-                    if SAVE_LIDAR_DATA and lidar_csv_writer:
-                        lidar_csv_writer.writerow([
-                            message["data"]["stamp"],
-                            message["data"]["frame_id"],
-                            message["data"]["resolution"],
-                            message["data"]["src_size"],
-                            message["data"]["origin"],
-                            message["data"]["width"],
-                            len(unique_points),
-                            unique_points.tolist()
-                        ])
-                        lidar_csv_file.flush()
-
-                    points = rotate_points(unique_points, ROTATE_X_ANGLE, ROTATE_Z_ANGLE)
-                    points = points[(points[:, 1] >= minYValue) & (points[:, 1] <= maxYValue)]
-
-                    # Calculate center coordinates (handle empty arrays)
-                    if len(points) == 0:
+                    unique_points = unique_points_of(points)
+
+                    # Record frame
+                    if SAVE_LIDAR_DATA and lidar_record_queue:
+                        lidar_record_queue.put((message["data"], unique_points))
+
+                    # Rotate, filter, offset by center coordinates and compute distances
+                    n, (center_x, center_y, center_z) = transform_points(unique_points, point_bufs)
+                    if n == 0:
                         _builtin_print("WARNING: No points after filtering, skipping message")
                         return
-                    center_x = float(np.mean(points[:, 0]))
-                    center_y = float(np.mean(points[:, 1]))
-                    center_z = float(np.mean(points[:, 2]))
-
-                    # Offset points by center coordinates
-                    offset_points = points - np.array([center_x, center_y, center_z])
+                    offset_points = point_bufs.xyz[:n]
+                    scalars = point_bufs.scalar[:n]
 
                     # Count and log points
                     message_count += 1
-                    _builtin_print(f"LIDAR Message {message_count}: Total={total_points}, Unique={len(unique_points)}, Filtered={len(offset_points)}")
+                    if message_count % LOG_EVERY_N_FRAMES == 0:
+                        logger.info("LIDAR Message %d: Total=%d, Unique=%d, Filtered=%d",
+                                    message_count, total_points, len(unique_points), len(offset_points))
 
                     # Emit data to Socket.IO (thread-safe emit)
-                    scalars = np.linalg.norm(offset_points, axis=1)
                     try:
-                        # Convert to lists and emit - socketio.emit works from background threads in threading mode
-                        points_list = offset_points.tolist()
-                        scalars_list = scalars.tolist()
-                        socketio.emit("lidar_data", {
-                            "points": points_list,
-                            "scalars": scalars_list,
-                            "center": {"x": center_x, "y": center_y, "z": center_z}
-                        })
-                        _builtin_print(f"  -> Emitted {len(points_list)} points to browser")
+                        # Emit raw float32 buffers as binary attachments - socketio.emit works from background threads in threading mode
+                        emitted = emit_lidar_frame(offset_points, scalars, (center_x, center_y, center_z))
+                        logger.debug("  -> Emitted %d points to browser", emitted)
                     except Exception as emit_err:
                         _builtin_print(f"ERROR emitting socketio event: {emit_err}")
                         import traceback
@@ -397,10 +617,22 @@ async def lidar_webrtc_connection():
             # Subscribe to LIDAR voxel map messages
             def lidar_message_handler(message):
                 """Handle incoming lidar messages."""
-                _builtin_print(f"DEBUG: Received lidar message, keys: {list(message.keys()) if isinstance(message, dict) else type(message)}")
-                if isinstance(message, dict) and "data" in message:
-                    _builtin_print(f"DEBUG: Message data keys: {list(message['data'].keys()) if isinstance(message['data'], dict) else type(message['data'])}")
-                asyncio.create_task(lidar_callback_task(message))
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Received lidar message, keys: %s",
+                                 list(message.keys()) if isinstance(message, dict) else type(message))
+                    if isinstance(message, dict) and "data" in message:
+                        logger.debug("Message data keys: %s",
+                                     list(message['data'].keys()) if isinstance(message['data'], dict) else type(message['data']))
+                _pending_lidar.append(message)
+                _lidar_executor.submit(process_latest)
+
+            def process_latest():
+                """Process the newest pending LIDAR message, if one is still queued."""
+                try:
+                    message = _pending_lidar.pop()
+                except IndexError:
+                    return  # Already consumed by an earlier submission
+                lidar_callback_task(message)
             
             conn.datachannel.pub_sub.subscribe(
                 "rt/utlidar/voxel_map_compressed",
@@ -424,13 +656,13 @@ async def lidar_webrtc_connection():
 
         except asyncio.TimeoutError:
             _builtin_print(f"Connection timed out. Retrying in {reconnect_interval} seconds... (Attempt {retry_attempts + 1}/{MAX_RETRY_ATTEMPTS})")
-            close_csv_output()
+            close_record_output()
             await asyncio.sleep(reconnect_interval)
             retry_attempts += 1
         except Exception as e:
             _builtin_print(f"Error: {e}")
             _builtin_print(f"Reconnecting in {reconnect_interval} seconds... (Attempt {retry_attempts + 1}/{MAX_RETRY_ATTEMPTS})")
-            close_csv_output()
+            close_record_output()
             try:
                 if 'conn' in locals():
                     await conn.disconnect()
@@ -441,62 +673,92 @@ async def lidar_webrtc_connection():
 
     _builtin_print("Max retry attempts reached. Exiting.")
 
+_BRACKETS_TO_SPACES = str.maketrans("[]", "  ")
+
+def parse_positions_cell(cell):
+    """Parse a recorded "[[x, y, z], ...]" CSV cell straight into an (N, 3) float32 array.
+
+    np.fromstring's C parser fills the array directly, without building the
+    intermediate Python lists and floats that json.loads would.
+    """
+    if cell in ("", "[]"):
+        return np.empty((0, 3), dtype=np.float32)
+    text = cell.translate(_BRACKETS_TO_SPACES)
+    return np.fromstring(text, dtype=np.float32, sep=",").reshape(-1, 3)
+
 async def read_csv_and_emit(csv_file):
     """Continuously read CSV files and emit data without delay."""
     global message_count
+    point_bufs = PointBuffers()
+    total_messages = "?"  # Known once the first pass has counted the rows
 
     while True:
         try:
-            total_messages = sum(1 for _ in open(csv_file)) - 1
-
             with open(csv_file, mode='r', newline='', encoding='utf-8') as lidar_file:
-                lidar_reader = csv.DictReader(lidar_file)
+                lidar_reader = csv.reader(lidar_file)
+                positions_col = next(lidar_reader).index("positions")
 
                 for lidar_row in lidar_reader:
                     if message_count % args.skip_mod == 0:
                         try:
-                            positions = ast.literal_eval(lidar_row.get("positions", "[]"))
-                            if isinstance(positions, list) and all(isinstance(item, list) and len(item) == 3 for item in positions):
-                                points = np.array(positions, dtype=np.float32)
-                            else:
-                                points = np.array([item for item in positions if isinstance(item, list) and len(item) == 3], dtype=np.float32)
-
-                            origin = np.array(eval(lidar_row.get("origin", "[]")), dtype=np.float32)
-                            resolution = float(lidar_row.get("resolution", 0.05))
-                            width = np.array(eval(lidar_row.get("width", "[128, 128, 38]")), dtype=np.float32)
-                            center = origin + (width * resolution) / 2
-
-                            if points.size > 0:
-                                points = rotate_points(points, ROTATE_X_ANGLE, ROTATE_Z_ANGLE)
-                                points = points[(points[:, 1] >= minYValue) & (points[:, 1] <= maxYValue)]
-                                unique_points = np.unique(points, axis=0)
-                                center_x = float(np.mean(unique_points[:, 0]))
-                                center_y = float(np.mean(unique_points[:, 1]))
-                                center_z = float(np.mean(unique_points[:, 2]))
-                                offset_points = unique_points - np.array([center_x, center_y, center_z])
-                            else:
-                                unique_points = np.empty((0, 3), dtype=np.float32)
-                                offset_points = unique_points
-
-                            scalars = np.linalg.norm(offset_points, axis=1)
-                            socketio.emit("lidar_data", {
-                                "points": offset_points.tolist(),
-                                "scalars": scalars.tolist(),
-                                "center": {"x": center_x, "y": center_y, "z": center_z}
-                            })
-
-                            _builtin_print(f"LIDAR Message {message_count}/{total_messages}: Unique points={len(unique_points)}")
+                            points = parse_positions_cell(lidar_row[positions_col])
+
+                            unique_points = unique_points_of(points)
+                            n, (center_x, center_y, center_z) = transform_points(unique_points, point_bufs)
+                            offset_points = point_bufs.xyz[:n]
+                            scalars = point_bufs.scalar[:n]
+
+                            emit_lidar_frame(offset_points, scalars, (center_x, center_y, center_z))
+
+                            if message_count % LOG_EVERY_N_FRAMES == 0:
+                                logger.info("LIDAR Message %d/%s: Unique points=%d",
+                                            message_count, total_messages, len(unique_points))
 
                         except Exception as e:
                             logging.error(f"Exception during processing: {e}")
 
                     message_count += 1
 
+            total_messages = message_count
             message_count = 0
 
         except Exception as e:
             logging.error(f"Error reading CSV file: {e}")
 
+async def read_bin_and_emit(bin_file):
+    """Continuously replay a binary recording and emit data without delay."""
+    global message_count
+    point_bufs = PointBuffers()
+
+    while True:
+        try:
+            with open(bin_file, mode='rb') as lidar_file, \
+                    mmap.mmap(lidar_file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                for _, points in iter_frames(buf):
+                    if message_count % args.skip_mod == 0:
+                        try:
+                            unique_points = unique_points_of(points)
+                            n, (center_x, center_y, center_z) = transform_points(unique_points, point_bufs)
+                            offset_points = point_bufs.xyz[:n]
+                            scalars = point_bufs.scalar[:n]
+
+                            emit_lidar_frame(offset_points, scalars, (center_x, center_y, center_z))
+
+                            if message_count % LOG_EVERY_N_FRAMES == 0:
+                                logger.info("LIDAR Message %d: Unique points=%d", message_count, len(unique_points))
+
+                        except Exception as e:
+                            logging.error(f"Exception during processing: {e}")
+
+                    message_count += 1
+                # Drop the last frame view before the mmap is closed
+                points = None
+
+            message_count = 0
+
+        except Exception as e:
+            logging.error(f"Error reading recording file: {e}")
+
 @app.route("/")
 def index():
     return render_template_string("""
@@ -518,6 +780,12 @@ def index():
         <div id="status">Connecting...</div>
         <script>
             let scene, camera, renderer, controls, pointCloud, voxelMesh;
+            // Persistent point cloud buffers, updated in place every frame
+            let pointCapacity = 0, pointPositions, pointColors;
+            // Persistent voxel InstancedMesh; replaced only when it has to grow
+            let voxelCapacity = 0;
+            // Worker-side copies of the instance buffers; null while the worker holds them
+            let voxelScratch = null;
             let voxelSize = 1.0;
             let transparency = .5;
             let wireframe = false;
@@ -559,6 +827,30 @@ def index():
 
                     const axesHelper = new THREE.AxesHelper(5);
                     scene.add(axesHelper);
+
+                    pointCloud = new THREE.Points(
+                        new THREE.BufferGeometry(),
+                        new THREE.PointsMaterial({ size: 3.0, vertexColors: true })
+                    );
+                    // Stale data past the draw range would skew the bounding sphere
+                    pointCloud.frustumCulled = false;
+                    ensurePointCapacity({{ max_points }});
+                    scene.add(pointCloud);
+
+                    // One unit cube shared by every voxel; each voxel is an instance of it.
+                    // Colors come from instanceColor, so no per-vertex color attribute.
+                    voxelMesh = new THREE.InstancedMesh(
+                        new THREE.BoxGeometry(voxelSize, voxelSize, voxelSize),
+                        new THREE.MeshBasicMaterial({
+                            side: THREE.DoubleSide,
+                            transparent: true,
+                            opacity: transparency,
+                            wireframe: wireframe
+                        }),
+                        0
+                    );
+                    voxelMesh.visible = false;
+                    scene.add(voxelMesh);
                                                                                                                               
                     const statusDiv = document.getElementById("status");
                     
@@ -605,42 +897,46 @@ def index():
                                   
                     socket.on("lidar_data", (data) => {
                         console.log("Received LIDAR data event", data);
-                        const points = data.points || [];
-                        const scalars = data.scalars || [];
-                        console.log("Processing", points.length, "points");
-                        statusDiv.textContent = `Receiving LiDAR: ${points.length} points`;
+                        // points/scalars arrive as binary float32 buffers (x,y,z interleaved)
+                        const count = data.count || 0;
+                        const points = new Float32Array(data.points || new ArrayBuffer(0));
+                        const scalars = new Float32Array(data.scalars || new ArrayBuffer(0));
+                        const maxScalar = data.max_scalar || 1.0;
+                        console.log("Processing", count, "points");
+                        statusDiv.textContent = `Receiving LiDAR: ${count} points`;
                         
-                        if (points.length === 0) {
+                        if (count === 0) {
                             console.warn("Received empty point array");
                             return;
                         }
 
                         if (pointCloudEnable > 0) {
-                            if (pointCloud) scene.remove(pointCloud);
-                            if (voxelMesh) {
-                                scene.remove(voxelMesh);
-                                voxelMesh = null;
+                            // A voxel frame queued behind the worker is stale now
+                            pendingVoxelFrame = null;
+                            voxelMesh.visible = false;
+
+                            ensurePointCapacity(count);
+                            const geometry = pointCloud.geometry;
+                            pointPositions.set(points);
+
+                            const colors = pointColors;
+                            const lutScale = maxScalar > 0 ? 255 / maxScalar : 0;
+                            for (let i = 0; i < count; i++) {
+                                const c = Math.min(255, (scalars[i] * lutScale) | 0) * 3;
+                                colors[i * 3] = POINT_COLOR_LUT[c];
+                                colors[i * 3 + 1] = POINT_COLOR_LUT[c + 1];
+                                colors[i * 3 + 2] = POINT_COLOR_LUT[c + 2];
                             }
 
-                            const geometry = new THREE.BufferGeometry();
-                            const vertices = new Float32Array(points.flat());
-                            geometry.setAttribute('position', new THREE.BufferAttribute(vertices, 3));
-
-                            const colors = new Float32Array(scalars.length * 3);
-                            const maxScalar = Math.max.apply(null, scalars);
-                            scalars.forEach((scalar, i) => {
-                                const color = new THREE.Color();
-                                color.setHSL(scalar / maxScalar, 1.0, 0.5);
-                                colors.set([color.r, color.g, color.b], i * 3);
-                            });
-
-                            geometry.setAttribute('color', new THREE.BufferAttribute(colors, 3));
-                            geometry.computeBoundingBox();
-
-                            const material = new THREE.PointsMaterial({ size: 3.0, vertexColors: true });
-                            pointCloud = new THREE.Points(geometry, material);
-
-                            scene.add(pointCloud);
+                            // Upload only the prefix in use, not the whole persistent buffer
+                            geometry.attributes.position.updateRange.count = count * 3;
+                            geometry.attributes.color.updateRange.count = count * 3;
+                            geometry.attributes.position.needsUpdate = true;
+                            geometry.attributes.color.needsUpdate = true;
+                            geometry.setDrawRange(0, count);
+                            // computeBoundingBox() would scan the whole buffer, not just the draw range
+                            geometry.boundingBox = boundsOf(points, count);
+                            pointCloud.visible = true;
                             
                             // Adjust camera to view the point cloud
                             if (geometry.boundingBox) {
@@ -655,15 +951,8 @@ def index():
                                 controls.update();
                             }
                         } else {
-                            if (voxelMesh) scene.remove(voxelMesh);
-                            voxelMesh = createVoxelMesh(points, scalars, voxelSize, Infinity);
-                            if (voxelMesh instanceof THREE.Object3D) {
-                                scene.add(voxelMesh);
-                            }
-                            if (pointCloud) {
-                                scene.remove(pointCloud);
-                                pointCloud = null;
-                            }
+                            updateVoxelMesh(points, scalars, count, maxScalar, Infinity);
+                            pointCloud.visible = false;
                         }
                     });
 
@@ -679,103 +968,230 @@ def index():
                 init();
             });
 
+            // Same result as THREE.Color.setHSL, written straight into out[base..base+2]
+            function hslToRgb(h, s, l, out, base) {
+                h = ((h % 1) + 1) % 1;
+                if (s === 0) {
+                    out[base] = out[base + 1] = out[base + 2] = l;
+                    return;
+                }
+                const p = l <= 0.5 ? l * (1 + s) : l + s - l * s;
+                const q = 2 * l - p;
+                out[base] = hueToRgb(q, p, h + 1 / 3);
+                out[base + 1] = hueToRgb(q, p, h);
+                out[base + 2] = hueToRgb(q, p, h - 1 / 3);
+            }
+
+            function hueToRgb(p, q, t) {
+                if (t < 0) t += 1;
+                if (t > 1) t -= 1;
+                if (t < 1 / 6) return p + (q - p) * 6 * t;
+                if (t < 1 / 2) return q;
+                if (t < 2 / 3) return p + (q - p) * 6 * (2 / 3 - t);
+                return p;
+            }
+
+            function ensurePointCapacity(n) {
+                if (n <= pointCapacity) return;
+                pointCapacity = Math.max(n, pointCapacity * 2);
+                pointPositions = new Float32Array(pointCapacity * 3);
+                pointColors = new Float32Array(pointCapacity * 3);
+                const geometry = pointCloud.geometry;
+                geometry.setAttribute('position', new THREE.BufferAttribute(pointPositions, 3).setUsage(THREE.DynamicDrawUsage));
+                geometry.setAttribute('color', new THREE.BufferAttribute(pointColors, 3).setUsage(THREE.DynamicDrawUsage));
+            }
+
+            function boundsOf(points, count) {
+                const box = new THREE.Box3();
+                const p = new THREE.Vector3();
+                for (let i = 0; i < count; i++) {
+                    box.expandByPoint(p.set(points[i * 3], points[i * 3 + 1], points[i * 3 + 2]));
+                }
+                return box;
+            }
+
             function pollArgs() {
                 pollingInterval = setInterval(() => {
                     socket.emit('check_args');
                 }, 1000);
             }                     
                                      
-            function createVoxelMesh(points, scalars, voxelSize, maxVoxelsToShow = Infinity) {
-                const geometry = new THREE.BufferGeometry();
+            // 256-step colormaps indexed by (scalar / maxScalar * 255) | 0; the hue
+            // ramp is the only thing that varies, so HSL is converted once up front
+            const POINT_COLOR_LUT = buildHueLut(1.0, Float32Array, 1);
+            const VOXEL_COLOR_LUT = buildHueLut(0.7, Uint8Array, 255);
+
+            function buildHueLut(hueSpan, ArrayType, scale) {
+                const lut = new ArrayType(256 * 3);
+                const rgb = new Float32Array(3);
+                // Round rather than truncate when storing into integer channels
+                const bias = scale > 1 ? 0.5 : 0;
+                for (let k = 0; k < 256; k++) {
+                    hslToRgb((k / 255) * hueSpan, 1.0, 0.5, rgb, 0);
+                    lut[k * 3] = rgb[0] * scale + bias;
+                    lut[k * 3 + 1] = rgb[1] * scale + bias;
+                    lut[k * 3 + 2] = rgb[2] * scale + bias;
+                }
+                return lut;
+            }
 
-                try {
-                    const halfSize = voxelSize / 2;
-                    const cubeVertexOffsets = [
-                        [-halfSize, -halfSize, -halfSize],
-                        [halfSize, -halfSize, -halfSize],
-                        [halfSize, halfSize, -halfSize],
-                        [-halfSize, halfSize, -halfSize],
-                        [-halfSize, -halfSize, halfSize],
-                        [halfSize, -halfSize, halfSize],
-                        [halfSize, halfSize, halfSize],
-                        [-halfSize, halfSize, halfSize]
-                    ];
-
-                    const cubeIndices = [
-                        0, 1, 2, 2, 3, 0,
-                        4, 5, 6, 6, 7, 4,
-                        0, 1, 5, 5, 4, 0,
-                        2, 3, 7, 7, 6, 2,
-                        0, 3, 7, 7, 4, 0,
-                        1, 2, 6, 6, 5, 1
-                    ];
-
-                    const maxVoxels = Math.min(maxVoxelsToShow, points.length);
-                    const maxScalar = Math.max(...scalars);
-
-                    const positions = new Float32Array(maxVoxels * 8 * 3);
-                    const colors = new Float32Array(maxVoxels * 8 * 3);
-                    const indices = new Uint32Array(maxVoxels * 36);
-
-                    let positionOffset = 0;
-                    let colorOffset = 0;
-                    let indexOffset = 0;
-
-                    for (let i = 0; i < maxVoxels; i++) {
-                        const centerX = points[i][0];
-                        const centerY = points[i][1];
-                        const centerZ = points[i][2];
-
-                        const normalizedScalar = scalars[i] / maxScalar;
-                        const color = new THREE.Color();
-                        color.setHSL(normalizedScalar * 0.7, 1.0, 0.5);
-
-                        for (let j = 0; j < 8; j++) {
-                            const [dx, dy, dz] = cubeVertexOffsets[j];
-                            positions[positionOffset++] = centerX + dx;
-                            positions[positionOffset++] = centerY + dy;
-                            positions[positionOffset++] = centerZ + dz;
-
-                            colors[colorOffset++] = color.r;
-                            colors[colorOffset++] = color.g;
-                            colors[colorOffset++] = color.b;
-                        }
+            // Instance buffers cost a float32 mat4 plus 3 color bytes per voxel;
+            // clamp the voxel count up front rather than waiting for a RangeError
+            const VOXEL_MEMORY_BUDGET = 128 * 1024 * 1024;
+            const MAX_VOXELS = Math.floor(VOXEL_MEMORY_BUDGET / (16 * 4 + 3));
 
-                        for (let j = 0; j < cubeIndices.length; j++) {
-                            indices[indexOffset++] = cubeIndices[j] + i * 8;
-                        }
-                    }
+            // Column-major identity; instances only ever differ in the translation lanes 12..14
+            const INSTANCE_MATRIX_TPL = new Float32Array(new THREE.Matrix4().elements);
 
-                    geometry.setAttribute("position", new THREE.BufferAttribute(positions, 3));
-                    geometry.setAttribute("color", new THREE.BufferAttribute(colors, 3));
-                    geometry.setIndex(new THREE.BufferAttribute(indices, 1));
-
-                    } catch (error) {
-                        THREE.Cache.clear();
-                        if (error instanceof RangeError) {
-                            console.error("Array buffer allocation failed:", error);
-                            THREE.Cache.clear();
-                            if (window.gc) window.gc();
-                            return new THREE.Mesh(new THREE.BufferGeometry(), new THREE.MeshBasicMaterial());
-                        } else {
-                            throw error;
-                        }
+            function nextPow2(n) {
+                return n <= 1 ? 1 : 2 ** Math.ceil(Math.log2(n));
+            }
+
+            // Grows the persistent voxel mesh to hold n instances; never shrinks
+            function ensureVoxelCapacity(n) {
+                if (n <= voxelCapacity) return;
+                const capacity = Math.min(nextPow2(n), MAX_VOXELS);
+                const mesh = new THREE.InstancedMesh(voxelMesh.geometry, voxelMesh.material, capacity);
+                mesh.instanceMatrix.setUsage(THREE.DynamicDrawUsage);
+                const matrices = mesh.instanceMatrix.array;
+                for (let k = 0; k < capacity; k++) {
+                    matrices.set(INSTANCE_MATRIX_TPL, k * 16);
+                }
+                // 8-bit normalized color is plenty for an HSL ramp and a quarter of
+                // the float upload; setColorAt() would also size this from mesh.count
+                mesh.instanceColor = new THREE.InstancedBufferAttribute(new Uint8Array(capacity * 3), 3, true);
+                mesh.instanceColor.setUsage(THREE.DynamicDrawUsage);
+                // Allocated before the swap so a RangeError leaves the old mesh intact
+                const scratch = {
+                    matrices: new Float32Array(matrices),
+                    colors: new Uint8Array(capacity * 3)
+                };
+                // Instances are spread far beyond the unit cube's bounding sphere
+                mesh.frustumCulled = false;
+                // Nothing to draw until the worker fills the first frame
+                mesh.count = 0;
+                mesh.visible = voxelMesh.visible;
+
+                scene.remove(voxelMesh);
+                voxelMesh.dispose();
+                voxelMesh = mesh;
+                voxelCapacity = capacity;
+                scene.add(voxelMesh);
+                voxelScratch = scratch;
+            }
+
+            // Instance data is filled off the main thread into scratch copies, which are
+            // transferred to the worker and back. The mesh's own arrays are never
+            // detached (three.js may upload them at any render); the filled prefix is
+            // copied into them when the worker hands back. Meanwhile newer frames only
+            // replace pendingVoxelFrame; the latest one is sent after the reply.
+            function fillVoxelInstances(points, scalars, count, lutScale, lut, matrices, colors) {
+                // Matrices were pre-baked as identity, so only the translation
+                // lanes and the color triple are written per voxel
+                for (let i = 0; i < count; i++) {
+                    const m = i * 16 + 12;
+                    matrices[m] = points[i * 3];
+                    matrices[m + 1] = points[i * 3 + 1];
+                    matrices[m + 2] = points[i * 3 + 2];
+
+                    const c = Math.min(255, (scalars[i] * lutScale) | 0) * 3;
+                    colors[i * 3] = lut[c];
+                    colors[i * 3 + 1] = lut[c + 1];
+                    colors[i * 3 + 2] = lut[c + 2];
+                }
+            }
+
+            const voxelWorker = new Worker(URL.createObjectURL(new Blob([
+                fillVoxelInstances.toString(),
+                `
+                let lut;
+                onmessage = (e) => {
+                    const msg = e.data;
+                    if (msg.lut) {
+                        lut = msg.lut;
+                        return;
                     }
+                    const matrices = new Float32Array(msg.matrices);
+                    const colors = new Uint8Array(msg.colors);
+                    fillVoxelInstances(new Float32Array(msg.points), new Float32Array(msg.scalars),
+                                       msg.count, msg.lutScale, lut, matrices, colors);
+                    postMessage({ matrices: msg.matrices, colors: msg.colors, count: msg.count },
+                                [msg.matrices, msg.colors]);
+                };
+                `
+            ], { type: "application/javascript" })));
+            voxelWorker.postMessage({ lut: VOXEL_COLOR_LUT });
+
+            let voxelWorkerBusy = false;
+            let pendingVoxelFrame = null;
+
+            voxelWorker.onmessage = (e) => {
+                const matrices = new Float32Array(e.data.matrices);
+                const colors = new Uint8Array(e.data.colors);
+                const count = e.data.count;
+                voxelScratch = { matrices, colors };
+                voxelMesh.instanceMatrix.array.set(matrices.subarray(0, count * 16));
+                voxelMesh.instanceColor.array.set(colors.subarray(0, count * 3));
+                voxelMesh.count = count;
+                // Upload only the instances in use, not the whole capacity
+                voxelMesh.instanceMatrix.updateRange.count = count * 16;
+                voxelMesh.instanceColor.updateRange.count = count * 3;
+                voxelMesh.instanceMatrix.needsUpdate = true;
+                voxelMesh.instanceColor.needsUpdate = true;
+                voxelWorkerBusy = false;
+
+                // The view may have switched to the point cloud while the worker ran
+                if (pointCloudEnable > 0) {
+                    pendingVoxelFrame = null;
+                    voxelMesh.visible = false;
+                    return;
+                }
+                if (pendingVoxelFrame) {
+                    const frame = pendingVoxelFrame;
+                    pendingVoxelFrame = null;
+                    updateVoxelMesh(...frame);
+                }
+            };
 
-                const material = new THREE.MeshBasicMaterial({
-                    vertexColors: true,
-                    side: THREE.DoubleSide,
-                    transparent: true,
-                    opacity: transparency,
-                    wireframe: wireframe
-                });
+            function updateVoxelMesh(points, scalars, count, maxScalar, maxVoxelsToShow = Infinity) {
+                voxelMesh.visible = true;
+                if (voxelWorkerBusy) {
+                    pendingVoxelFrame = [points, scalars, count, maxScalar, maxVoxelsToShow];
+                    return;
+                }
+
+                let maxVoxels = Math.min(maxVoxelsToShow, count, MAX_VOXELS);
+
+                try {
+                    ensureVoxelCapacity(maxVoxels);
+                } catch (error) {
+                    if (!(error instanceof RangeError)) throw error;
+                    // Shouldn't happen within the budget; keep drawing with the capacity we have
+                    console.error("Array buffer allocation failed:", error);
+                    THREE.Cache.clear();
+                    // Still the initial empty mesh (no instanceColor): nothing to draw into
+                    if (voxelCapacity === 0) return;
+                    maxVoxels = Math.min(maxVoxels, voxelCapacity);
+                }
 
-                return new THREE.Mesh(geometry, material);
+                const matrices = voxelScratch.matrices.buffer;
+                const colors = voxelScratch.colors.buffer;
+                voxelScratch = null;
+                voxelWorkerBusy = true;
+                voxelWorker.postMessage({
+                    points: points.buffer,
+                    scalars: scalars.buffer,
+                    count: maxVoxels,
+                    // One multiply per voxel instead of a divide
+                    lutScale: maxScalar > 0 ? 255 / maxScalar : 0,
+                    matrices,
+                    colors
+                }, [points.buffer, scalars.buffer, matrices, colors]);
             }
         </script>
     </body>
     </html>
-    """)
+    """, max_points=MAX_POINTS)
 
 def start_webrtc():
     """Run WebRTC connection in a separate asyncio loop."""
@@ -784,14 +1200,16 @@ def start_webrtc():
     loop.run_until_complete(lidar_webrtc_connection())
 
 if __name__ == "__main__":
-    import threading
     _builtin_print("=" * 60)
     _builtin_print("Go2 LiDAR Visualization")
     _builtin_print("=" * 60)
     _builtin_print("\nIMPORTANT: Make sure the Unitree Go2 mobile app is CLOSED")
     _builtin_print("           Open http://127.0.0.1:8080/ in your browser\n")
     
-    if args.csv_read:
+    if args.bin_read:
+        bin_thread = threading.Thread(target=lambda: asyncio.run(read_bin_and_emit(args.bin_read)), daemon=True)
+        bin_thread.start()
+    elif args.csv_read:
         csv_thread = threading.Thread(target=lambda: asyncio.run(read_csv_and_emit(args.csv_read)), daemon=True)
         csv_thread.start()
     else:
@@ -12,20 +12,29 @@ Then open http://127.0.0.1:8080/ in your browser.
 """
 
 import builtins as _builtins
-import re as _re
 import sys
 import os
 import signal
 
 # Remove emojis from output for Windows terminal compatibility
 _builtin_print = _builtins.print
-emoji_pattern = _re.compile(r'[\U0001F300-\U0001FAD6\U0001FAE0-\U0001FAFF\U00002700-\U000027BF\U0001F600-\U0001F64F\U0001F680-\U0001F6FF\U0001F700-\U0001F77F\U0001F780-\U0001F7FF\U000025A0-\U000026FF]+', flags=_re.UNICODE)
+
+class _Cp1252Filter(dict):
+    """str.translate table deleting characters cp1252 can't encode; filled lazily per code point"""
+    def __missing__(self, c):
+        v = c if chr(c).encode('cp1252', errors='ignore') else None
+        self[c] = v
+        return v
+
+_cp1252_filter = _Cp1252Filter()
 
 def _no_emoji_print(*args, **kwargs):
     cleaned_args = []
     for a in args:
-        s = str(a)
-        s = s.encode('cp1252', errors='ignore').decode('cp1252')
+        s = a if type(a) is str else str(a)
+        # Pure-ASCII strings (nearly every print) are already cp1252-safe
+        if not s.isascii():
+            s = s.translate(_cp1252_filter)
         cleaned_args.append(s)
     return _builtin_print(*cleaned_args, **kwargs)
 
@@ -43,8 +52,9 @@ import asyncio
 import json
 import threading
 import time
-import base64
+from concurrent.futures import ThreadPoolExecutor
 import cv2
+import numpy as np
 from flask import Flask, render_template, jsonify
 from flask_socketio import SocketIO
 
@@ -56,6 +66,15 @@ import go2_webrtc_driver.unitree_auth as _unitree_auth
 import go2_webrtc_driver.webrtc_driver as _webrtc_driver_mod
 from aiortc import RTCPeerConnection, RTCSessionDescription
 
+# Optional libjpeg-turbo binding; falls back to cv2.imencode when unavailable
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbojpeg = TurboJPEG()
+    HAVE_TURBOJPEG = True
+except (ImportError, OSError, RuntimeError):
+    _turbojpeg = None
+    HAVE_TURBOJPEG = False
+
 # Flask app setup
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'animus-go2-video-stream-secret'
@@ -70,9 +89,22 @@ socketio = SocketIO(
     logger=False
 )
 
-# Video frame storage
-latest_frame = None
-frame_lock = threading.Lock()
+# Used by both encoders so the stream looks the same with or without TurboJPEG
+JPEG_QUALITY = 80
+
+# JPEG encoding runs here so it never blocks the asyncio loop
+_encode_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jpeg")
+
+STREAM_FPS = 10.0
+# Frames taller than this are downscaled (keeping aspect) before encoding;
+# the viewer canvas is 640x480
+MAX_STREAM_HEIGHT = 480
+
+# Latest encoded frame as (seq, jpeg_bytes): single producer (track handler),
+# single consumer (stream thread). Assigning a list item is atomic, so no lock
+# is needed, and seq lets the consumer tell a new frame from one already sent.
+_frame_slot = [(0, None)]
+_frame_ready = threading.Event()
 
 # Stats tracking
 stats = {
@@ -201,11 +233,35 @@ _webrtc_driver_mod.Go2WebRTCConnection.get_answer_from_local_peer = _patched_get
 
 # === Video handling ===
 
+def encode_jpeg(img_array):
+    """Encode a BGR frame to JPEG bytes, or return None if encoding failed."""
+    if HAVE_TURBOJPEG:
+        return _turbojpeg.encode(img_array, quality=JPEG_QUALITY, pixel_format=TJPF_BGR)
+    success, buffer = cv2.imencode('.jpg', img_array, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    if not success:
+        return None
+    return buffer.tobytes()
+
+def frame_to_bgr(frame, out):
+    """Convert a decoded av.VideoFrame to a BGR ndarray, writing into out when possible.
+
+    yuv420p frames (what the Go2 H.264 track decodes to) are converted by OpenCV
+    straight into the reused buffer; other layouts fall back to PyAV's bgr24 path.
+    """
+    if frame.format.name == 'yuv420p' and out.shape[:2] == (frame.height, frame.width):
+        return cv2.cvtColor(frame.to_ndarray(), cv2.COLOR_YUV2BGR_I420, dst=out)
+    return frame.to_ndarray(format='bgr24')
+
 async def video_track_handler(track):
     """Read frames from the video track and store them for streaming."""
-    global latest_frame
-
     _builtin_print("Video track handler started")
+    loop = asyncio.get_running_loop()
+    # Reused across frames; safe because each encode is awaited before the next frame
+    bgr_buf = np.empty((0, 0, 3), dtype=np.uint8)
+    small_buf = np.empty((0, 0, 3), dtype=np.uint8)
+    # The stream thread never sends faster than STREAM_FPS, so don't encode faster either
+    next_encode = 0.0
+    frame_seq = 0
 
     try:
         while not _shutdown_requested:
@@ -215,17 +271,34 @@ async def video_track_handler(track):
                 _builtin_print(f"Error receiving video frame: {recv_error}")
                 break
 
+            stats['frames_received'] += 1
+            stats['last_frame_time'] = time.time()
+
+            now = time.monotonic()
+            if now < next_encode:
+                continue
+            next_encode = now + 1.0 / STREAM_FPS
+
             try:
-                img_array = frame.to_ndarray(format='bgr24')
-                success, buffer = cv2.imencode('.jpg', img_array)
-                if not success:
+                if bgr_buf.shape[:2] != (frame.height, frame.width):
+                    bgr_buf = np.empty((frame.height, frame.width, 3), dtype=np.uint8)
+                img_array = frame_to_bgr(frame, bgr_buf)
+
+                if frame.height > MAX_STREAM_HEIGHT:
+                    small_h = MAX_STREAM_HEIGHT
+                    small_w = frame.width * MAX_STREAM_HEIGHT // frame.height
+                    if small_buf.shape[:2] != (small_h, small_w):
+                        small_buf = np.empty((small_h, small_w, 3), dtype=np.uint8)
+                    img_array = cv2.resize(img_array, (small_w, small_h), dst=small_buf,
+                                           interpolation=cv2.INTER_AREA)
+
+                jpeg_bytes = await loop.run_in_executor(_encode_pool, encode_jpeg, img_array)
+                if jpeg_bytes is None:
                     continue
-                jpeg_bytes = buffer.tobytes()
 
-                with frame_lock:
-                    latest_frame = jpeg_bytes
-                    stats['frames_received'] += 1
-                    stats['last_frame_time'] = time.time()
+                frame_seq += 1
+                _frame_slot[0] = (frame_seq, jpeg_bytes)
+                _frame_ready.set()
             except Exception as process_error:
                 _builtin_print(f"Error processing video frame: {process_error}")
                 continue
@@ -348,18 +421,31 @@ def handle_get_stats():
     })
 
 def video_stream_thread():
-    """Thread to periodically send video frames to connected clients."""
+    """Thread to send each new video frame to connected clients, capped at STREAM_FPS."""
+    next_emit = 0.0
+    last_sent_seq = 0
     while not _shutdown_requested:
         try:
-            with frame_lock:
-                frame_data = latest_frame
-                if frame_data:
-                    # Convert to base64 for transmission
-                    b64_frame = base64.b64encode(frame_data).decode('ascii')
-                    socketio.emit('video_frame', {'data': b64_frame})
-                    stats['frames_sent'] += 1
-
-            time.sleep(1.0 / 10.0)  # 10 FPS max
+            # Wake on frame arrival; the timeout only bounds shutdown latency
+            if not _frame_ready.wait(timeout=0.1):
+                continue
+
+            delay = next_emit - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            _frame_ready.clear()
+            seq, frame_data = _frame_slot[0]
+            # The event can fire again for a frame already picked up after clear()
+            if seq == last_sent_seq:
+                continue
+            last_sent_seq = seq
+            if frame_data:
+                # JPEG bytes go out as a binary Socket.IO attachment
+                socketio.emit('video_frame', frame_data)
+                stats['frames_sent'] += 1
+
+            next_emit = time.monotonic() + 1.0 / STREAM_FPS
 
         except Exception as e:
             _builtin_print(f"Video streaming error: {e}")
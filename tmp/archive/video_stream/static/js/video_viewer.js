@@ -32,8 +32,8 @@ class VideoViewer {
         });
 
         // Handle video frames
-        this.socket.on('video_frame', (data) => {
-            this.displayFrame(data.data);
+        this.socket.on('video_frame', (jpegData) => {
+            this.displayFrame(jpegData);
         });
 
         // Handle stats updates
@@ -47,14 +47,17 @@ class VideoViewer {
         console.log('Video viewer initialized');
     }
 
-    displayFrame(base64Data) {
+    displayFrame(jpegData) {
         if (!this.ctx) return;
 
         try {
-            // Create image from base64 data
+            // Create image from the binary JPEG payload
             const img = new Image();
+            const url = URL.createObjectURL(new Blob([jpegData], { type: 'image/jpeg' }));
 
             img.onload = () => {
+                URL.revokeObjectURL(url);
+
                 // Clear canvas
                 this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
 
@@ -77,11 +80,12 @@ class VideoViewer {
             };
 
             img.onerror = (error) => {
+                URL.revokeObjectURL(url);
                 console.error('Error loading video frame:', error);
             };
 
             // Set image source
-            img.src = 'data:image/jpeg;base64,' + base64Data;
+            img.src = url;
 
         } catch (error) {
             console.error('Error displaying video frame:', error);
@@ -3,9 +3,13 @@ Debug script to list all devices detected by the inputs library.
 This helps troubleshoot controller detection issues.
 """
 
+import re
 import sys
+from collections import defaultdict
 from inputs import devices
 
+XBOX_NAME_RE = re.compile(r"xbox|microsoft|controller", re.IGNORECASE)
+
 print("=" * 60)
 print("Input Devices Debug Tool")
 print("=" * 60)
@@ -26,12 +30,9 @@ print(f"Total devices detected: {len(all_devices)}")
 print()
 
 # Group by device type
-by_type = {}
+by_type = defaultdict(list)
 for device in all_devices:
-    dev_type = device.device_type
-    if dev_type not in by_type:
-        by_type[dev_type] = []
-    by_type[dev_type].append(device)
+    by_type[device.device_type].append(device)
 
 print("Devices by type:")
 print()
@@ -43,18 +44,14 @@ print()
 
 # Look for Xbox controllers specifically
 print("Searching for Xbox controllers...")
-xbox_keywords = ["xbox", "microsoft", "controller"]
 found_xbox = False
 
 for device in all_devices:
-    name_lower = device.name.lower()
-    for keyword in xbox_keywords:
-        if keyword in name_lower:
-            print(f"  ✓ Potential Xbox controller found:")
-            print(f"    Name: '{device.name}'")
-            print(f"    Type: {device.device_type}")
-            found_xbox = True
-            break
+    if XBOX_NAME_RE.search(device.name):
+        print(f"  ✓ Potential Xbox controller found:")
+        print(f"    Name: '{device.name}'")
+        print(f"    Type: {device.device_type}")
+        found_xbox = True
 
 if not found_xbox:
     print("  ✗ No devices matching Xbox controller keywords found.")